@@ -4,11 +4,27 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import runpy
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from deepseek_client import DeepSeekError, chat_completion, load_config_from_env
+from deepseek_client import DeepSeekConfig, DeepSeekError, chat_completion, load_config_from_env
+from literature_io import read_text_cached
+
+MAX_CONCURRENT_IDEAS = 4
+
+# Concurrent drafts can't see each other, so proposal i is pinned to
+# IDEA_ANGLES[i % len(IDEA_ANGLES)] to keep the batch from converging.
+IDEA_ANGLES = (
+    "a new method or mechanism (model, algorithm, or agent architecture)",
+    "data: a new dataset, benchmark, or data-collection procedure",
+    "evaluation: metrics, failure taxonomy, or a rigorous empirical study of existing systems",
+    "a systems or efficiency angle (cost, latency, scale, or tooling in real workflows)",
+    "human factors: how developers or reviewers interact with the system",
+    "a negative or robustness result: where current approaches break and why",
+)
 
 
 def ensure_workshop(workshop_file: Path) -> None:
@@ -29,24 +45,38 @@ def extract_json(text: str) -> dict | None:
         return None
 
 
-def generate_ideas_compat(workshop_text: str, *, max_ideas: int, num_reflections: int) -> list[dict]:
-    try:
-        cfg = load_config_from_env()
-    except DeepSeekError as e:
-        raise SystemExit(f"DeepSeek not configured: {e}") from e
+def _refine(idea: dict, *, cfg: DeepSeekConfig) -> dict:
+    refine_prompt = f"""
+Refine the following proposal to improve novelty and feasibility. Output ONLY JSON with the same schema.
 
-    ideas: list[dict] = []
-    for i in range(max_ideas):
-        prev = json.dumps(ideas, ensure_ascii=False, indent=2)
-        prompt = f"""
-You are an AI research ideation system. Produce one proposal at a time.
+Proposal JSON:
+{json.dumps(idea, ensure_ascii=False, indent=2)}
+""".strip()
+    refined = chat_completion(
+        [{"role": "user", "content": refine_prompt}],
+        config=cfg,
+        temperature=0.3,
+        max_tokens=1400,
+    )
+    return extract_json(refined) or idea
+
+
+def _generate_one(workshop_text: str, i: int, *, cfg: DeepSeekConfig, max_ideas: int, num_reflections: int) -> dict:
+    angle = IDEA_ANGLES[i % len(IDEA_ANGLES)]
+    others = sorted({IDEA_ANGLES[j % len(IDEA_ANGLES)] for j in range(max_ideas)} - {angle})
+    avoid = "".join(f"\n- {a}" for a in others)
+    if i >= len(IDEA_ANGLES):
+        # More ideas than angles: later rounds reuse an angle, so steer them
+        # to a different subproblem than the earlier proposal on it.
+        angle += f" (round {i // len(IDEA_ANGLES) + 1}: target a different subproblem than earlier rounds on this angle)"
+    prompt = f"""
+You are an AI research ideation system. Produce proposal {i + 1} of {max_ideas}.
+Its primary contribution must be: {angle}.
+The other proposals are drafted in parallel and cover these angles, so do not make them your main contribution:{avoid or " (none)"}
 
 Workshop description:
 {workshop_text}
 
-Previous proposals (JSON list):
-{prev}
-
 Output ONLY JSON with this schema:
 {{
   "Name": "...",
@@ -58,31 +88,49 @@ Output ONLY JSON with this schema:
   "Risk Factors and Limitations": ["..."]
 }}
 """.strip()
-        content = chat_completion(
-            [{"role": "user", "content": prompt}],
-            config=cfg,
-            temperature=0.4,
-            max_tokens=1600,
-        )
-        idea = extract_json(content) or {"raw": content}
+    content = chat_completion(
+        [{"role": "user", "content": prompt}],
+        config=cfg,
+        temperature=0.4,
+        max_tokens=1600,
+    )
+    idea = extract_json(content) or {"raw": content}
 
-        for _ in range(max(0, num_reflections - 1)):
-            refine_prompt = f"""
-Refine the following proposal to improve novelty and feasibility. Output ONLY JSON with the same schema.
+    # Reflections refine the same idea, so they stay sequential.
+    for _ in range(max(0, num_reflections - 1)):
+        idea = _refine(idea, cfg=cfg)
+    return idea
 
-Proposal JSON:
-{json.dumps(idea, ensure_ascii=False, indent=2)}
-""".strip()
-            refined = chat_completion(
-                [{"role": "user", "content": refine_prompt}],
-                config=cfg,
-                temperature=0.3,
-                max_tokens=1400,
-            )
-            idea = extract_json(refined) or idea
 
-        ideas.append(idea)
-    return ideas
+def generate_ideas_compat(workshop_text: str, *, max_ideas: int, num_reflections: int) -> list[dict]:
+    try:
+        cfg = load_config_from_env()
+    except DeepSeekError as e:
+        raise SystemExit(f"DeepSeek not configured: {e}") from e
+
+    # Ideas are independent LLM round trips; draft them concurrently, but
+    # keep only a few requests in flight against the DeepSeek rate limit.
+    with ThreadPoolExecutor(max_workers=max(1, min(max_ideas, MAX_CONCURRENT_IDEAS))) as pool:
+        futures = [
+            pool.submit(_generate_one, workshop_text, i, cfg=cfg, max_ideas=max_ideas, num_reflections=num_reflections)
+            for i in range(max_ideas)
+        ]
+        return [f.result() for f in futures]
+
+
+def run_ideation_in_process(ai_home: Path, argv: list[str]) -> None:
+    """Run the ideation script in this interpreter instead of a fresh subprocess."""
+    argv_backup, path_backup = sys.argv, list(sys.path)
+    sys.argv = argv
+    sys.path.insert(0, str(ai_home))
+    try:
+        runpy.run_path(argv[0], run_name="__main__")
+    except SystemExit as e:
+        if e.code:
+            raise
+    finally:
+        sys.argv = argv_backup
+        sys.path[:] = path_backup
 
 
 def main() -> int:
@@ -111,9 +159,8 @@ def main() -> int:
         if not ideation_script.exists():
             raise SystemExit(f"AI-Scientist-v2 script not found: {ideation_script}")
 
-        python_bin = os.getenv("AI_SCIENTIST_PYTHON") or sys.executable
-        cmd = [
-            python_bin,
+        python_bin = os.getenv("AI_SCIENTIST_PYTHON")
+        ideation_argv = [
             str(ideation_script),
             "--workshop-file",
             str(workshop_file),
@@ -124,13 +171,19 @@ def main() -> int:
             "--num-reflections",
             str(int(args.num_reflections)),
         ]
-        subprocess.run(cmd, check=True)
+        # No separate interpreter configured: skip the cold start and re-import
+        # of AI-Scientist-v2 deps. A venv's python is often a symlink to the same
+        # binary, so an explicit AI_SCIENTIST_PYTHON always gets a subprocess.
+        if not python_bin:
+            run_ideation_in_process(ai_home, ideation_argv)
+        else:
+            subprocess.run([python_bin, *ideation_argv], check=True)
         idea_path = Path(str(workshop_file)).with_suffix(".json")
         if not idea_path.exists():
             raise SystemExit(f"AI-Scientist-v2 output not found: {idea_path}")
         ideas = json.loads(idea_path.read_text(encoding="utf-8"))
     else:
-        workshop_text = workshop_file.read_text(encoding="utf-8")
+        workshop_text = read_text_cached(workshop_file)
         ideas = generate_ideas_compat(
             workshop_text,
             max_ideas=int(args.max_ideas),
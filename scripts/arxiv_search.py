@@ -3,73 +3,88 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import json
+import io
 import time
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+import http_client
+from literature_io import LITERATURE_CACHE_PATH, add_cache_args, append_jsonl, install_cache_from_args
 
-ATOM_NS = {
-    "atom": "http://www.w3.org/2005/Atom",
-    "arxiv": "http://arxiv.org/schemas/atom",
-}
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - optional speedup, stdlib ElementTree otherwise
+    lxml_etree = None
 
 
-def fetch_xml(url: str, user_agent: str, timeout_s: int = 30) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return resp.read().decode("utf-8")
+# Clark-notation tags: find() on a plain tag skips the per-call prefix lookup.
+_ENTRY = "{http://www.w3.org/2005/Atom}entry"
+_ID = "{http://www.w3.org/2005/Atom}id"
+_TITLE = "{http://www.w3.org/2005/Atom}title"
+_SUMMARY = "{http://www.w3.org/2005/Atom}summary"
+_AUTHOR = "{http://www.w3.org/2005/Atom}author"
+_NAME = "{http://www.w3.org/2005/Atom}name"
+_LINK = "{http://www.w3.org/2005/Atom}link"
+_PUBLISHED = "{http://www.w3.org/2005/Atom}published"
+_UPDATED = "{http://www.w3.org/2005/Atom}updated"
+_PRIMARY_CATEGORY = "{http://arxiv.org/schemas/atom}primary_category"
+_ARXIV_DOI = "{http://arxiv.org/schemas/atom}doi"
 
 
-def text_or_none(elem: ET.Element | None) -> str | None:
-    if elem is None or elem.text is None:
-        return None
-    t = elem.text.strip()
-    return t or None
+def fetch_xml(url: str, user_agent: str, timeout_s: int = 30) -> bytes:
+    return http_client.get(url, headers={"User-Agent": user_agent}, timeout_s=timeout_s)
 
 
-def parse_feed(xml_text: str) -> list[dict[str, Any]]:
-    root = ET.fromstring(xml_text)
-    entries = []
-    for entry in root.findall("atom:entry", ATOM_NS):
-        authors = [text_or_none(a.find("atom:name", ATOM_NS)) for a in entry.findall("atom:author", ATOM_NS)]
+def text_or_none(elem: ET.Element | None) -> str | None:
+    if elem is None or not (text := elem.text):
+        return None
+    return text.strip() or None
+
+
+def iter_entries(xml: bytes) -> Iterator[ET.Element]:
+    """Stream feed entries one at a time; each is cleared once the caller moves on."""
+    if lxml_etree is not None:
+        # lxml filters by tag in C; also drop finished siblings from the tree.
+        for _, elem in lxml_etree.iterparse(io.BytesIO(xml), events=("end",), tag=_ENTRY, resolve_entities=False):
+            yield elem
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        return
+    for _, elem in ET.iterparse(io.BytesIO(xml), events=("end",)):
+        if elem.tag == _ENTRY:
+            yield elem
+            elem.clear()
+
+
+def parse_feed(xml: bytes) -> Iterator[dict[str, Any]]:
+    for entry in iter_entries(xml):
+        authors = [text_or_none(a.find(_NAME)) for a in entry.findall(_AUTHOR)]
         authors = [a for a in authors if a]
-        links = entry.findall("atom:link", ATOM_NS)
+        links = entry.findall(_LINK)
         url = None
         for link in links:
             if link.attrib.get("rel") == "alternate" and link.attrib.get("type") == "text/html":
                 url = link.attrib.get("href")
                 break
-
-        entries.append(
-            {
-                "source": "arxiv",
-                "query": None,
-                "retrieved_at": None,
-                "id": text_or_none(entry.find("atom:id", ATOM_NS)),
-                "title": text_or_none(entry.find("atom:title", ATOM_NS)),
-                "published": text_or_none(entry.find("atom:published", ATOM_NS)),
-                "updated": text_or_none(entry.find("atom:updated", ATOM_NS)),
-                "summary": text_or_none(entry.find("atom:summary", ATOM_NS)),
-                "authors": authors,
-                "primary_category": entry.find("arxiv:primary_category", ATOM_NS).attrib.get("term")
-                if entry.find("arxiv:primary_category", ATOM_NS) is not None
-                else None,
-                "url": url,
-            }
-        )
-    return entries
-
-
-def append_jsonl(path: Path, records: list[dict[str, Any]]) -> int:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    return len(records)
+        primary = entry.find(_PRIMARY_CATEGORY)
+
+        yield {
+            "source": "arxiv",
+            "query": None,
+            "retrieved_at": None,
+            "id": text_or_none(entry.find(_ID)),
+            "title": text_or_none(entry.find(_TITLE)),
+            "published": text_or_none(entry.find(_PUBLISHED)),
+            "updated": text_or_none(entry.find(_UPDATED)),
+            "summary": text_or_none(entry.find(_SUMMARY)),
+            "authors": authors,
+            "primary_category": primary.attrib.get("term") if primary is not None else None,
+            "doi": text_or_none(entry.find(_ARXIV_DOI)),
+            "url": url,
+        }
 
 
 def main() -> int:
@@ -79,9 +94,12 @@ def main() -> int:
     parser.add_argument("--start", type=int, default=0, help="Start offset")
     parser.add_argument("--sleep", type=float, default=0.5, help="Sleep seconds between requests")
     parser.add_argument("--out", default="literature/library.jsonl", help="Output JSONL path (relative to repo root)")
+    add_cache_args(parser)
     args = parser.parse_args()
 
     root = Path(__file__).resolve().parents[1]
+    install_cache_from_args(args, root / LITERATURE_CACHE_PATH)
+
     out_path = (root / args.out).resolve()
 
     max_results = max(1, int(args.max_results))
@@ -98,11 +116,8 @@ def main() -> int:
         "sortOrder": "descending",
     }
     url = f"{base}?{urllib.parse.urlencode(params)}"
-    xml_text = fetch_xml(url, user_agent="thesis-research/0.1")
-    records = parse_feed(xml_text)
-    for rec in records:
-        rec["query"] = args.query
-        rec["retrieved_at"] = retrieved_at
+    xml = fetch_xml(url, user_agent="thesis-research/0.1")
+    records = ({**rec, "query": args.query, "retrieved_at": retrieved_at} for rec in parse_feed(xml))
     count = append_jsonl(out_path, records)
     time.sleep(max(0.0, float(args.sleep)))
 
@@ -2,67 +2,43 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import datetime as dt
 import hashlib
+import heapq
 import json
 import os
 import random
+import re
 import subprocess
 import sys
 import time
 import urllib.parse
-import urllib.request
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable, TypedDict
+from typing import Any, Container, Iterable, TextIO, TypedDict
 
-from deepseek_client import DeepSeekError, chat_completion, load_config_from_env
+import arxiv_search
+import openalex_search
+from deepseek_client import DeadlineExceeded, DeepSeekError, chat_completion_stream, load_config_from_env
+from literature_io import add_cache_args, append_jsonl, install_cache_from_args, read_text_cached
 
 try:
     from langgraph.graph import END, StateGraph
 except ImportError as exc:  # pragma: no cover - dependency check
     raise SystemExit("langgraph is required. Install with: pip install -r requirements.txt") from exc
 
-
-ATOM_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup, stdlib json otherwise
+    orjson = None
 
 
 def utc_now_iso() -> str:
     return dt.datetime.now(dt.UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def fetch_json(url: str, *, user_agent: str, timeout_s: int = 60) -> dict[str, Any]:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def fetch_xml(url: str, *, user_agent: str, timeout_s: int = 60) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return resp.read().decode("utf-8")
-
-
-def text_or_none(elem: ET.Element | None) -> str | None:
-    if elem is None or elem.text is None:
-        return None
-    t = elem.text.strip()
-    return t or None
-
-
-def inverted_index_to_text(inv: dict[str, list[int]] | None) -> str | None:
-    if not inv:
-        return None
-    positions: dict[int, str] = {}
-    for token, idxs in inv.items():
-        for i in idxs:
-            positions[int(i)] = token
-    if not positions:
-        return None
-    return " ".join(positions[i] for i in sorted(positions.keys())).strip() or None
-
-
 @dataclass(frozen=True)
 class Paper:
     source: str
@@ -84,12 +60,16 @@ class PaperHit:
     paper: Paper
 
 
+SEEN_KEYS_MAX = 20000
+
+
 class AutoState(TypedDict, total=False):
     queries: list[str]
     retrieved_at: str
     cycle: int
     llm_calls: int
     seen_keys: list[str]
+    new_keys: list[str]
     all_hits: list[PaperHit]
     fresh: list[PaperHit]
     selected: list[PaperHit]
@@ -100,39 +80,124 @@ class AutoState(TypedDict, total=False):
     ai_scientist_ideas_path: str
 
 
+def identifier_key(source: str, candidates: Iterable[Any]) -> str | None:
+    for k in candidates:
+        if k:
+            s = k.strip() if isinstance(k, str) else str(k).strip()
+            if "\n" in s or "\r" in s:
+                # Keys are stored one per line in seen_keys.txt.
+                s = " ".join(s.split())
+            if s:
+                return f"{source}:{s}"
+    return None
+
+
+_DOI_PREFIXES = ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:")
+
+
+def normalize_doi(doi: str | None) -> str | None:
+    if not doi:
+        return None
+    d = doi.strip().lower()
+    for prefix in _DOI_PREFIXES:
+        if d.startswith(prefix):
+            d = d[len(prefix) :]
+            break
+    return d or None
+
+
+def record_key(source: str, doi: str | None, candidates: Iterable[Any]) -> str | None:
+    # DOI keys carry no source, so arXiv and OpenAlex copies of a paper collapse.
+    d = normalize_doi(doi)
+    if d:
+        return f"doi:{d}"
+    return identifier_key(source, candidates)
+
+
+def already_seen(seen: Container[str], source: str, doi: str | None, candidates: Iterable[Any]) -> bool:
+    """Whether a record's key, or the source-id key older state holds for it, is in ``seen``.
+
+    Before DOI keys, arXiv records were stored as arxiv:<id>; now that they
+    carry a DOI their key is doi:..., which upgrade_key can't derive.
+    """
+    candidates = tuple(candidates)
+    if record_key(source, doi, candidates) in seen:
+        return True
+    return normalize_doi(doi) is not None and identifier_key(source, candidates) in seen
+
+
+def upgrade_key(key: str) -> str:
+    """Map keys saved before DOI normalization (openalex:https://doi.org/...) to doi: keys."""
+    source, _, rest = key.partition(":")
+    if source != "doi" and rest.lower().startswith(_DOI_PREFIXES[:4]):
+        return f"doi:{normalize_doi(rest)}"
+    return key
+
+
+# Shorter normalized titles ("introduction", "editorial") are too generic to merge on.
+TITLE_KEY_MIN_CHARS = 16
+_NON_WORD = re.compile(r"\W+")
+
+
+def title_key(title: str | None) -> str | None:
+    t = _NON_WORD.sub("", (title or "").lower())
+    return f"title:{t}" if len(t) >= TITLE_KEY_MIN_CHARS else None
+
+
+def is_title_key(key: str) -> bool:
+    return key.startswith("title:")
+
+
+def richness(p: Paper) -> tuple[int, int]:
+    return (1 if (p.abstract or p.summary) else 0, int(p.cited_by_count or 0))
+
+
 def paper_key(p: Paper) -> str:
-    for k in [p.doi, p.id, p.url, p.title]:
-        if k and str(k).strip():
-            return f"{p.source}:{str(k).strip()}"
-    payload = json.dumps(
-        {"source": p.source, "title": p.title, "url": p.url, "authors": p.authors, "year": p.year},
-        ensure_ascii=False,
-        sort_keys=True,
-    )
-    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    key = record_key(p.source, p.doi, (p.id, p.url, p.title))
+    if key is not None:
+        return key
+    # Only reached when every identifier is empty (all but unheard of).
+    payload = f"{p.source}|{p.title}|{p.url}|{p.year}|{'|'.join(p.authors)}"
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
     return f"{p.source}:unknown:{digest}"
 
 
-def search_openalex(*, query: str, pages: int, per_page: int, email: str | None) -> list[Paper]:
+def search_openalex(
+    *, query: str, pages: int, per_page: int, email: str | None, seen: Container[str] = frozenset()
+) -> list[Paper]:
     base = "https://api.openalex.org/works"
     ua = "thesis-research/0.1 (mailto:unknown)" if not email else f"thesis-research/0.1 (mailto:{email})"
     per_page = max(1, min(200, int(per_page)))
     pages = max(1, int(pages))
 
-    out: list[Paper] = []
+    urls = []
     for page in range(1, pages + 1):
         params = {"search": query, "per-page": str(per_page), "page": str(page)}
         if email:
             params["mailto"] = email
-        url = f"{base}?{urllib.parse.urlencode(params)}"
-        payload = fetch_json(url, user_agent=ua)
+        urls.append(f"{base}?{urllib.parse.urlencode(params)}")
+
+    # Pages are independent: fetch them together (http_client caps in-flight
+    # requests per host) and parse in page order. A single page (the default)
+    # is fetched inline.
+    if len(urls) == 1:
+        payloads = [openalex_search.fetch_json(urls[0], user_agent=ua, timeout_s=60)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(urls)) as pool:
+            payloads = list(pool.map(lambda u: openalex_search.fetch_json(u, user_agent=ua, timeout_s=60), urls))
+    out: list[Paper] = []
+    for payload in payloads:
         for item in payload.get("results", []) or []:
+            # Same key paper_key() would give (url is the OpenAlex id); skip
+            # already-seen works before parsing authors and the abstract.
+            if already_seen(seen, "openalex", item.get("doi"), (item.get("id"), item.get("display_name"))):
+                continue
             authors = []
             for auth in (item.get("authorships") or []):
                 name = (((auth.get("author") or {}).get("display_name")) or "").strip()
                 if name:
                     authors.append(name)
-            abstract = inverted_index_to_text(item.get("abstract_inverted_index"))
+            abstract = openalex_search.inverted_index_to_text(item.get("abstract_inverted_index"))
             out.append(
                 Paper(
                     source="openalex",
@@ -148,11 +213,10 @@ def search_openalex(*, query: str, pages: int, per_page: int, email: str | None)
                     summary=None,
                 )
             )
-        time.sleep(0.2)
     return out
 
 
-def search_arxiv(*, query: str, max_results: int) -> list[Paper]:
+def search_arxiv(*, query: str, max_results: int, seen: Container[str] = frozenset()) -> list[Paper]:
     base = "http://export.arxiv.org/api/query"
     search_query = f'all:"{query}"'
     params = {
@@ -163,33 +227,26 @@ def search_arxiv(*, query: str, max_results: int) -> list[Paper]:
         "sortOrder": "descending",
     }
     url = f"{base}?{urllib.parse.urlencode(params)}"
-    xml_text = fetch_xml(url, user_agent="thesis-research/0.1")
-    root = ET.fromstring(xml_text)
+    xml = arxiv_search.fetch_xml(url, user_agent="thesis-research/0.1", timeout_s=60)
 
     out: list[Paper] = []
-    for entry in root.findall("atom:entry", ATOM_NS):
-        authors = [text_or_none(a.find("atom:name", ATOM_NS)) for a in entry.findall("atom:author", ATOM_NS)]
-        authors = [a for a in authors if a]
-        links = entry.findall("atom:link", ATOM_NS)
-        url_html = None
-        for link in links:
-            if link.attrib.get("rel") == "alternate" and link.attrib.get("type") == "text/html":
-                url_html = link.attrib.get("href")
-                break
-
+    for rec in arxiv_search.parse_feed(xml):
+        entry_id = rec["id"]
+        if entry_id and already_seen(seen, "arxiv", rec["doi"], (entry_id,)):
+            continue
         out.append(
             Paper(
                 source="arxiv",
-                id=text_or_none(entry.find("atom:id", ATOM_NS)),
-                title=text_or_none(entry.find("atom:title", ATOM_NS)),
+                id=entry_id,
+                title=rec["title"],
                 year=None,
                 venue="arXiv",
                 cited_by_count=None,
-                authors=authors,
-                url=url_html,
-                doi=None,
+                authors=rec["authors"],
+                url=rec["url"],
+                doi=rec["doi"],
                 abstract=None,
-                summary=text_or_none(entry.find("atom:summary", ATOM_NS)),
+                summary=rec["summary"],
             )
         )
     return out
@@ -213,9 +270,14 @@ AI_KEYWORDS = [
 ]
 
 
+# A keyword that contains another keyword can never change the outcome
+# ("code review" implies "code"), so only the minimal needles are scanned.
+_AI_NEEDLES = tuple(k for k in AI_KEYWORDS if not any(o != k and o in k for o in AI_KEYWORDS))
+
+
 def ai_signal(p: Paper) -> int:
     hay = " ".join([p.title or "", p.abstract or "", p.summary or ""]).lower()
-    return 1 if any(k in hay for k in AI_KEYWORDS) else 0
+    return 1 if any(k in hay for k in _AI_NEEDLES) else 0
 
 
 def rank(p: Paper) -> tuple[int, int, int, int]:
@@ -226,35 +288,172 @@ def rank(p: Paper) -> tuple[int, int, int, int]:
     return (ai, has_text, cited, year)
 
 
+_CREATED_DIRS: set[Path] = set()
+_APPEND_FILES: dict[Path, TextIO] = {}
+
+
 def ensure_dir(path: Path) -> None:
+    if path in _CREATED_DIRS:
+        return
     path.mkdir(parents=True, exist_ok=True)
+    _CREATED_DIRS.add(path)
 
 
 def load_state(path: Path) -> dict[str, Any]:
     if not path.exists():
-        return {"seen_keys": [], "last_run_at": None, "run_count": 0}
-    return json.loads(path.read_text(encoding="utf-8"))
+        return {"last_run_at": None, "run_count": 0}
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 
 def save_state(path: Path, state: dict[str, Any]) -> None:
     ensure_dir(path.parent)
-    path.write_text(json.dumps(state, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if orjson is not None:
+        data = orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(state, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+    path.write_bytes(data + b"\n")
 
 
-def append_jsonl(path: Path, records: Iterable[dict[str, Any]]) -> int:
-    ensure_dir(path.parent)
+def recent_keys(keys: list[str]) -> list[str]:
+    """Suffix of ``keys`` holding the last SEEN_KEYS_MAX paper keys.
+
+    Title keys ride along with the papers they were recorded for instead of
+    taking window slots, so the window spans SEEN_KEYS_MAX papers either way.
+    """
     n = 0
-    with path.open("a", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    for i in range(len(keys) - 1, -1, -1):
+        if not is_title_key(keys[i]):
             n += 1
-    return n
+            if n > SEEN_KEYS_MAX:
+                return keys[i + 1 :]
+    return keys
 
 
-def append_text(path: Path, line: str) -> None:
+def _count_paper_keys(keys: Iterable[str]) -> int:
+    return sum(1 for k in keys if not is_title_key(k))
+
+
+# Paper keys (title keys excluded) currently in each seen-keys file, so
+# appends know when to compact.
+_SEEN_KEY_COUNTS: dict[Path, int] = {}
+
+
+def load_seen_keys(path: Path) -> list[str]:
+    """Keys for the most recent SEEN_KEYS_MAX papers from the append-only keys file."""
+    if not path.exists():
+        _SEEN_KEY_COUNTS[path] = 0
+        return []
+    keys = path.read_text(encoding="utf-8").splitlines()
+    _SEEN_KEY_COUNTS[path] = _count_paper_keys(keys)
+    return [upgrade_key(k) for k in recent_keys(keys)]
+
+
+def write_seen_keys(path: Path, keys: Iterable[str]) -> None:
+    ensure_dir(path.parent)
+    keys = recent_keys(list(keys))
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text("".join(k + "\n" for k in keys), encoding="utf-8")
+    tmp.replace(path)
+    _SEEN_KEY_COUNTS[path] = _count_paper_keys(keys)
+
+
+def append_seen_keys(path: Path, new_keys: list[str], *, recent: Iterable[str]) -> None:
+    """Append ``new_keys``; once the file would pass 2x the window, rewrite it as ``recent``."""
+    count = _SEEN_KEY_COUNTS.get(path, 0) + _count_paper_keys(new_keys)
+    if count > 2 * SEEN_KEYS_MAX:
+        write_seen_keys(path, recent)
+        return
+    if not new_keys:
+        return
     ensure_dir(path.parent)
     with path.open("a", encoding="utf-8") as f:
-        f.write(line.rstrip() + "\n")
+        f.writelines(k + "\n" for k in new_keys)
+    _SEEN_KEY_COUNTS[path] = count
+
+
+def library_shard(path: Path, retrieved_at: str) -> Path:
+    """Monthly shard next to ``path``, e.g. library-2025-01.jsonl."""
+    return path.with_name(f"{path.stem}-{retrieved_at[:7]}{path.suffix}")
+
+
+def append_text(path: Path, line: str) -> None:
+    # Kept open for the whole run; line buffering flushes every entry.
+    f = _APPEND_FILES.get(path)
+    if f is None:
+        ensure_dir(path.parent)
+        f = _APPEND_FILES[path] = path.open("a", encoding="utf-8", buffering=1)
+    f.write(line.rstrip() + "\n")
+
+
+BRIEF_JSON_SCHEMA = """{
+  "top_papers": [{"n": <paper n>, "why": "..."}],
+  "pairings": [{"a": <paper n>, "b": <paper n>, "why": "..."}],
+  "method": "...",
+  "evaluation_plan": "...",
+  "draft_abstract": "...",
+  "next_step": "...",
+  "out_of_scope": [<paper n>]
+}"""
+
+BRIEF_SECTIONS = [
+    ("method", "Method"),
+    ("evaluation_plan", "Evaluation Plan"),
+    ("draft_abstract", "Draft Abstract"),
+    ("next_step", "Next Step Direction"),
+]
+
+
+def parse_brief(raw: str) -> dict[str, Any] | None:
+    text = raw.strip()
+    if text.startswith("```"):
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _md_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return "\n".join(f"- {_md_text(v)}" for v in value)
+    if isinstance(value, dict):
+        return "\n".join(f"- **{k}**: {_md_text(v)}" for k, v in value.items())
+    return "" if value is None else str(value)
+
+
+def render_brief(brief: dict[str, Any], items: list[dict[str, Any]]) -> str:
+    """Markdown for a JSON-mode brief; citations resolve from ``items`` by n."""
+    by_n = {it["n"]: it for it in items}
+
+    def cite(n: Any) -> str:
+        try:
+            it = by_n.get(int(n))
+        except (TypeError, ValueError):
+            it = None
+        if it is None:
+            return f"[{n}] (unknown paper)"
+        link = it.get("doi") or it.get("url")
+        return f"[{n}] {it.get('title')}" + (f" ({link})" if link else "")
+
+    lines = ["# Autopilot Brief", "", "## Top Papers", ""]
+    for entry in brief.get("top_papers") or []:
+        if isinstance(entry, dict):
+            lines.append(f"- {cite(entry.get('n'))}: {_md_text(entry.get('why'))}")
+    lines += ["", "## Pairings", ""]
+    for entry in brief.get("pairings") or []:
+        if isinstance(entry, dict):
+            lines.append(f"- {cite(entry.get('a'))} + {cite(entry.get('b'))}: {_md_text(entry.get('why'))}")
+    for key, heading in BRIEF_SECTIONS:
+        lines += ["", f"## {heading}", "", _md_text(brief.get(key)) or "(none)"]
+    out_of_scope = brief.get("out_of_scope") or []
+    if out_of_scope:
+        lines += ["", "## Out of Scope", ""]
+        lines += [f"- {cite(n)}" for n in out_of_scope]
+    return "\n".join(lines)
 
 
 def build_graph(*, root: Path, topic_dir: Path, errors_path: Path, args: argparse.Namespace) -> Any:
@@ -262,62 +461,91 @@ def build_graph(*, root: Path, topic_dir: Path, errors_path: Path, args: argpars
     ensure_dir(runs_dir)
     library_path = root / "literature" / "library.jsonl"
     state_path = root / "state" / "autopilot.json"
+    seen_keys_path = root / "state" / "seen_keys.txt"
 
     def collect(state: AutoState) -> dict[str, Any]:
         retrieved_at = utc_now_iso()
         errors = list(state.get("errors") or [])
         hits: list[PaperHit] = []
+        seen = frozenset(state.get("seen_keys") or [])
+
+        def fetch_openalex(q: str) -> list[Paper]:
+            return search_openalex(
+                query=q,
+                pages=args.openalex_pages,
+                per_page=args.openalex_per_page,
+                email=args.email or None,
+                seen=seen,
+            )
 
-        for q in state.get("queries") or []:
-            try:
-                for p in search_openalex(
-                    query=q,
-                    pages=args.openalex_pages,
-                    per_page=args.openalex_per_page,
-                    email=args.email or None,
-                ):
-                    hits.append(PaperHit(query=q, paper=p))
-            except Exception as e:
-                msg = f"{retrieved_at} openalex error ({q}): {e}"
-                errors.append(msg)
-                append_text(errors_path, msg)
-            try:
-                for p in search_arxiv(query=q, max_results=args.arxiv_max):
-                    hits.append(PaperHit(query=q, paper=p))
-            except Exception as e:
-                msg = f"{retrieved_at} arxiv error ({q}): {e}"
-                errors.append(msg)
-                append_text(errors_path, msg)
+        def fetch_arxiv(q: str) -> list[Paper]:
+            return search_arxiv(query=q, max_results=args.arxiv_max, seen=seen)
+
+        # Fetches are I/O bound: run them concurrently, but consume results in
+        # (query, provider) order so dedup/ranking stay deterministic.
+        providers = [("openalex", fetch_openalex), ("arxiv", fetch_arxiv)]
+        with ThreadPoolExecutor(max_workers=max(1, int(args.fetch_workers))) as pool:
+            futures = [(name, q, pool.submit(fn, q)) for q in state.get("queries") or [] for name, fn in providers]
+            for name, q, fut in futures:
+                try:
+                    papers = fut.result()
+                except Exception as e:
+                    msg = f"{retrieved_at} {name} error ({q}): {e}"
+                    errors.append(msg)
+                    append_text(errors_path, msg)
+                    continue
+                hits.extend(PaperHit(query=q, paper=p) for p in papers)
 
         return {"retrieved_at": retrieved_at, "all_hits": hits, "errors": errors}
 
     def dedup(state: AutoState) -> dict[str, Any]:
-        seen = set(state.get("seen_keys") or [])
-        fresh: list[PaperHit] = []
+        recent = state.get("seen_keys") or []
+        seen = set(recent)
+        # One pass, first hit wins: also collapses the same paper returned by
+        # several queries (or by both sources, via its DOI) within this batch.
+        by_key: dict[str, PaperHit] = {}
         for hit in state.get("all_hits") or []:
-            k = paper_key(hit.paper)
-            if k in seen:
+            p = hit.paper
+            k = paper_key(p)
+            if k in by_key or k in seen or already_seen(seen, p.source, p.doi, (p.id, p.url, p.title)):
+                continue
+            by_key[k] = hit
+
+        # Second stage: copies without a shared DOI (preprint vs. published
+        # record) match on normalized title; keep the richer record, in the
+        # position of the first copy. Title keys are remembered across runs too.
+        groups: dict[str, PaperHit] = {}
+        for k, hit in by_key.items():
+            t = title_key(hit.paper.title)
+            if t is not None and t in seen:
                 continue
-            seen.add(k)
-            fresh.append(hit)
+            g = t or k
+            cur = groups.get(g)
+            if cur is None or richness(hit.paper) > richness(cur.paper):
+                groups[g] = hit
+        new_keys = list(by_key) + [g for g in groups if is_title_key(g)]
+        fresh = list(groups.values())
 
         if args.max_new_records > 0:
             fresh = fresh[: int(args.max_new_records)]
 
-        return {"fresh": fresh, "seen_keys": sorted(seen)[-20000:]}
+        # Oldest papers' keys fall off the front once the window is full.
+        return {"fresh": fresh, "seen_keys": recent_keys([*recent, *new_keys]), "new_keys": new_keys}
 
     def store(state: AutoState) -> dict[str, Any]:
         fresh = state.get("fresh") or []
         retrieved_at = state.get("retrieved_at") or utc_now_iso()
+        path = library_shard(library_path, retrieved_at) if args.shard_library else library_path
         wrote = append_jsonl(
-            library_path,
-            [to_library_record(hit.paper, query=hit.query, retrieved_at=retrieved_at) for hit in fresh],
+            path,
+            (to_library_record(hit.paper, query=hit.query, retrieved_at=retrieved_at) for hit in fresh),
         )
         return {"wrote": wrote}
 
     def select(state: AutoState) -> dict[str, Any]:
         fresh = state.get("fresh") or []
-        selected = sorted(fresh, key=lambda h: rank(h.paper), reverse=True)[: max(1, int(args.top_n))]
+        # rank() runs once per hit; nlargest keeps sorted(..., reverse=True)[:n] order in O(n log k).
+        selected = heapq.nlargest(max(1, int(args.top_n)), fresh, key=lambda h: rank(h.paper))
         return {"selected": selected}
 
     def ai_scientist_ideas(state: AutoState) -> dict[str, Any]:
@@ -410,11 +638,12 @@ def build_graph(*, root: Path, topic_dir: Path, errors_path: Path, args: argpars
                     "authors": p.authors[:10],
                     "url": p.url,
                     "doi": p.doi,
-                    "abstract_or_summary": (p.abstract or p.summary or "")[:2200],
+                    "abstract_or_summary": (p.abstract or p.summary or "")[:1500],
                 }
             )
 
-        topic_readme = (topic_dir / "README.md").read_text(encoding="utf-8") if (topic_dir / "README.md").exists() else ""
+        readme_path = topic_dir / "README.md"
+        topic_readme = read_text_cached(readme_path) if readme_path.exists() else ""
         ai_scientist_path = state.get("ai_scientist_ideas_path") or ""
         ai_scientist_ideas = ""
         if ai_scientist_path and Path(ai_scientist_path).exists():
@@ -430,7 +659,7 @@ AI-Scientist ideas (optional JSON):
 {ai_scientist_ideas}
 
 Candidate papers (JSON):
-{json.dumps(items, ensure_ascii=False, indent=2)}
+{json.dumps(items, ensure_ascii=False, separators=(",", ":"))}
 
 Tasks:
 1) Pick the top 8 papers and explain why (1-2 sentences each).
@@ -441,30 +670,63 @@ Tasks:
 6) Provide a "Next Step Direction" that goes one step beyond the papers (explicitly grounded in them).
 
 Hard rules:
-- Do NOT invent citations. Use ONLY the provided papers; cite by (title + url/doi).
+- Do NOT invent citations. Use ONLY the provided papers; cite them by their "n".
 - If evidence is missing, say so and propose how to collect it.
-- If a paper is not AI/LLM/SE related, mark it as out-of-scope and do not use it for pairings.
+- If a paper is not AI/LLM/SE related, list it in out_of_scope and do not use it for pairings.
 
-Output format: Markdown. Language: Korean (paper titles stay original).
+Output format: a single JSON object, no Markdown fences:
+{BRIEF_JSON_SCHEMA}
+Language of all text values: Korean (paper titles stay original).
 """.strip()
 
-        content = chat_completion(
+        # JSON mode: sections come back as fields and are rendered to Markdown
+        # here; deepseek-reasoner does not accept response_format, so it only
+        # gets the prompt instructions.
+        response_format = {"type": "json_object"} if cfg.model != "deepseek-reasoner" else None
+        # Enforced inside the stream so it also covers deepseek-reasoner's
+        # thinking phase (no content deltas) and max_tokens restarts.
+        deadline = time.monotonic() + float(args.max_llm_seconds) if args.max_llm_seconds > 0 else None
+        stream = chat_completion_stream(
             [
                 {"role": "system", "content": "You are a rigorous research lead. Be explicit about uncertainty and do not hallucinate citations."},
                 {"role": "user", "content": prompt},
             ],
             config=cfg,
             temperature=0.2,
-            max_tokens=1800,
+            # Sized from the item count so the first attempt rarely truncates.
+            max_tokens=400 + 120 * len(items),
+            response_format=response_format,
+            deadline=deadline,
         )
-        out_path.write_text(content.strip() + "\n", encoding="utf-8")
+        # Raw tokens go to a sidecar as they arrive; closing the stream early stops generation.
+        raw_path = out_path.with_suffix(".json")
+        chunks: list[str] = []
+        truncated = False
+        with contextlib.closing(stream), raw_path.open("w", encoding="utf-8") as f:
+            try:
+                for chunk in stream:
+                    chunks.append(chunk)
+                    f.write(chunk)
+            except DeadlineExceeded:
+                truncated = True
+
+        raw = "".join(chunks).strip()
+        brief = None if truncated else parse_brief(raw)
+        if brief is not None:
+            text = render_brief(brief, items)
+        else:
+            # Not valid JSON (or cut short): keep the model output as-is.
+            text = raw
+            if truncated:
+                text += f"\n\n> truncated: --max-llm-seconds={args.max_llm_seconds:g} reached"
+        out_path.write_text(text.strip() + "\n", encoding="utf-8")
         return {"out_path": str(out_path), "llm_calls": llm_calls + 1}
 
     def persist(state: AutoState) -> dict[str, Any]:
+        append_seen_keys(seen_keys_path, state.get("new_keys") or [], recent=state.get("seen_keys") or [])
         save_state(
             state_path,
             {
-                "seen_keys": state.get("seen_keys") or [],
                 "last_run_at": state.get("retrieved_at"),
                 "run_count": int(state.get("run_count") or 0),
             },
@@ -528,12 +790,19 @@ def main() -> int:
     parser.add_argument("--openalex-pages", type=int, default=1)
     parser.add_argument("--openalex-per-page", type=int, default=25)
     parser.add_argument("--arxiv-max", type=int, default=25)
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Concurrent OpenAlex/arXiv requests per cycle")
     parser.add_argument("--top-n", type=int, default=16)
     parser.add_argument("--run-hours", type=float, default=6.0, help="Max runtime hours (0 = run once)")
     parser.add_argument("--cycle-sleep-mins", type=float, default=30.0, help="Sleep minutes between cycles")
     parser.add_argument("--min-new-for-llm", type=int, default=3, help="Minimum new papers required to call LLM")
     parser.add_argument("--max-llm-calls", type=int, default=8, help="Max LLM calls per run")
+    parser.add_argument("--max-llm-seconds", type=float, default=0.0, help="Truncate a brief after this many seconds (0 = no limit)")
     parser.add_argument("--max-new-records", type=int, default=300, help="Cap new records per cycle")
+    parser.add_argument(
+        "--shard-library",
+        action="store_true",
+        help="Append to monthly literature/library-YYYY-MM.jsonl shards instead of one growing file",
+    )
     parser.add_argument("--enable-ai-scientist", action="store_true", help="Run AI-Scientist-v2 ideation step")
     parser.add_argument(
         "--ai-scientist-workshop",
@@ -543,6 +812,12 @@ def main() -> int:
     parser.add_argument("--ai-scientist-max-ideas", type=int, default=3)
     parser.add_argument("--ai-scientist-num-reflections", type=int, default=2)
     parser.add_argument("--email", default="", help="Optional email for OpenAlex mailto param")
+    add_cache_args(
+        parser,
+        default_ttl_mins=30.0,
+        ttl_help="Reuse cached OpenAlex/arXiv responses this long",
+        no_cache_help="Always refetch OpenAlex/arXiv responses",
+    )
     parser.add_argument("--no-llm", action="store_true", help="Collect only (no DeepSeek call)")
     args = parser.parse_args()
 
@@ -554,9 +829,15 @@ def main() -> int:
     queries = [q.strip() for q in (args.queries.split(",") if args.queries else DEFAULT_QUERIES) if q.strip()]
     random.Random(0).shuffle(queries)
 
+    install_cache_from_args(args, root / "state" / "http_cache.sqlite")
+
     state_path = root / "state" / "autopilot.json"
     state = load_state(state_path)
-    seen = set(state.get("seen_keys") or [])
+    seen_keys_path = root / "state" / "seen_keys.txt"
+    if not seen_keys_path.exists() and state.get("seen_keys"):
+        # One-time migration from the key list formerly kept in autopilot.json.
+        write_seen_keys(seen_keys_path, state["seen_keys"])
+    state["seen_keys"] = load_seen_keys(seen_keys_path)
 
     errors_path = root / "state" / "autopilot_errors.log"
     graph = build_graph(root=root, topic_dir=topic_dir, errors_path=errors_path, args=args)
@@ -1,20 +1,31 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import functools
+import http.client
 import json
 import os
 import time
-import urllib.error
-import urllib.request
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
+
+import http_client
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup, stdlib json otherwise
+    orjson = None
 
 
 class DeepSeekError(RuntimeError):
     pass
 
 
+class DeadlineExceeded(DeepSeekError):
+    """A streamed completion ran past the caller's ``deadline``."""
+
+
 @dataclass(frozen=True)
 class DeepSeekConfig:
     api_key: str
@@ -40,22 +51,25 @@ def normalize_model(model: str) -> str:
 def _load_env_file(path: Path) -> None:
     for line in path.read_text(encoding="utf-8").splitlines():
         raw = line.strip()
-        if not raw or raw.startswith("#") or "=" not in raw:
+        if not raw or raw.startswith("#"):
             continue
-        if raw.startswith("export "):
-            raw = raw[len("export ") :].strip()
-        key, value = raw.split("=", 1)
+        key, sep, value = raw.removeprefix("export ").partition("=")
         key = key.strip()
-        value = value.strip()
-        if not key or key in os.environ:
+        if not sep or not key or key in os.environ:
             continue
-        if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
+        value = value.strip()
+        if value[:1] in ("'", '"') and value[-1:] == value[:1]:
             value = value[1:-1]
         os.environ[key] = value
 
 
 def load_dotenv() -> Path | None:
-    cwd = Path.cwd()
+    return _load_dotenv_from(Path.cwd())
+
+
+@functools.lru_cache(maxsize=8)
+def _load_dotenv_from(cwd: Path) -> Path | None:
+    # Once per working directory: callers like autopilot reload config every cycle.
     loaded: Path | None = None
     for root in [cwd, *cwd.parents]:
         for name in (".env.local", ".env"):
@@ -90,11 +104,49 @@ def load_config_from_env() -> DeepSeekConfig:
     return DeepSeekConfig(api_key=api_key, model=model, base_url=base_url, api_path=api_path)
 
 
+# Error types that another attempt cannot fix (e.g. exhausted credits).
+NO_RETRY_ERRORS = ("insufficient_quota", "invalid_request_error")
+
+
+def _is_permanent_error(body: str) -> bool:
+    try:
+        err = _loads(body).get("error")
+    except (ValueError, AttributeError):
+        return False
+    if not isinstance(err, dict):
+        return False
+    return err.get("type") in NO_RETRY_ERRORS or err.get("code") in NO_RETRY_ERRORS
+
+
+def _retry_delay(e: http_client.HttpError, body: str, attempt: int) -> float | None:
+    """Seconds to wait before retrying ``e``, or None to fail fast."""
+    if e.status not in http_client.RETRY_STATUSES or _is_permanent_error(body):
+        return None
+    retry_after = http_client.retry_after_s(e.headers.get("Retry-After") if e.headers else None)
+    return max(0.8 * (2**attempt), retry_after)
+
+
+def _dumps(payload: dict[str, Any]) -> bytes:
+    return orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+
+
+def _loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _empty_content_error(config: DeepSeekConfig, finish_reason: str | None, detail: str) -> DeepSeekError:
+    if finish_reason == "length" and config.model == "deepseek-reasoner":
+        return DeepSeekError("Empty content from deepseek-reasoner; increase max_tokens or use deepseek-chat.")
+    if finish_reason == "length":
+        return DeepSeekError(f"Empty content from {config.model}: max_tokens reached; increase max_tokens.")
+    return DeepSeekError(f"Empty content{detail}")
+
+
 def _post_json(url: str, headers: dict[str, str], payload: dict[str, Any], timeout_s: int) -> dict[str, Any]:
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers={**headers, "Content-Type": "application/json"}, method="POST")
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    data = http_client.post(
+        url, headers={**headers, "Content-Type": "application/json"}, body=_dumps(payload), timeout_s=timeout_s
+    )
+    return _loads(data)
 
 
 def chat_completion(
@@ -104,6 +156,7 @@ def chat_completion(
     temperature: float = 0.2,
     max_tokens: int = 1200,
     retries: int = 3,
+    response_format: dict[str, Any] | None = None,
 ) -> str:
     url = f"{config.base_url}{config.api_path}"
     headers = {"Authorization": f"Bearer {config.api_key}", "User-Agent": "thesis-research/0.1"}
@@ -113,6 +166,8 @@ def chat_completion(
         "temperature": float(temperature),
         "stream": False,
     }
+    if response_format is not None:
+        payload_base["response_format"] = response_format
 
     last_err: Exception | None = None
     current_max_tokens = max(1, int(max_tokens))
@@ -133,22 +188,17 @@ def chat_completion(
             if reasoning and finish_reason == "length" and attempt < retries:
                 current_max_tokens = min(max(256, current_max_tokens * 2), 4096)
                 continue
-            if reasoning:
-                raise DeepSeekError("Empty content from deepseek-reasoner; increase max_tokens or use deepseek-chat.")
-            raise DeepSeekError(f"Empty content: {data!r}")
-        except urllib.error.HTTPError as e:
+            raise _empty_content_error(config, finish_reason, f": {data!r}")
+        except http_client.HttpError as e:
             last_err = e
-            try:
-                body = e.read().decode("utf-8", errors="replace")
-            except Exception:
-                body = ""
-            # 429/5xx: retry; others: fail fast
-            status = getattr(e, "code", None)
-            if status in (429, 500, 502, 503, 504) and attempt < retries:
-                time.sleep(0.8 * (2**attempt))
+            body = e.body.decode("utf-8", errors="replace")
+            # 429/5xx: retry (honoring Retry-After); quota errors and others: fail fast
+            delay = _retry_delay(e, body, attempt)
+            if delay is not None and attempt < retries:
+                time.sleep(delay)
                 continue
-            raise DeepSeekError(f"HTTPError {status}: {body}".strip()) from e
-        except (urllib.error.URLError, TimeoutError) as e:
+            raise DeepSeekError(f"HTTPError {e.status}: {body}".strip()) from e
+        except (OSError, http.client.HTTPException) as e:
             last_err = e
             if attempt < retries:
                 time.sleep(0.8 * (2**attempt))
@@ -156,3 +206,110 @@ def chat_completion(
             raise DeepSeekError(str(e)) from e
 
     raise DeepSeekError(str(last_err) if last_err else "Unknown error")
+
+
+def _open_stream(
+    url: str, headers: dict[str, str], body: bytes, *, timeout_s: int, retries: int
+) -> http.client.HTTPResponse:
+    for attempt in range(retries + 1):
+        try:
+            return http_client.open_stream("POST", url, headers=headers, body=body, timeout_s=timeout_s)
+        except http_client.HttpError as e:
+            body_text = e.body.decode("utf-8", errors="replace")
+            delay = _retry_delay(e, body_text, attempt)
+            if delay is not None and attempt < retries:
+                time.sleep(delay)
+                continue
+            raise DeepSeekError(f"HTTPError {e.status}: {body_text}".strip()) from e
+        except (OSError, http.client.HTTPException) as e:
+            if attempt < retries:
+                time.sleep(0.8 * (2**attempt))
+                continue
+            raise DeepSeekError(str(e)) from e
+    raise AssertionError("unreachable")
+
+
+def _check_deadline(deadline: float | None) -> None:
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded("Stream deadline reached.")
+
+
+def _stream_choices(resp: http.client.HTTPResponse, deadline: float | None = None) -> Iterator[dict[str, Any]]:
+    """Parse server-sent ``data:`` lines into choices until ``[DONE]``."""
+    try:
+        for raw in resp:
+            # Every line counts, keep-alives included: a reasoning model can
+            # stream for minutes without a single content delta.
+            _check_deadline(deadline)
+            line = raw.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:") :].strip()
+            if data == b"[DONE]":
+                return
+            choice = (_loads(data).get("choices") or [{}])[0] or {}
+            if not isinstance(choice, dict):
+                raise ValueError(f"unexpected choice: {choice!r}")
+            yield choice
+    except (OSError, http.client.HTTPException, ValueError, AttributeError) as e:
+        # Timeouts, truncated chunks and malformed events surface like other API errors.
+        raise DeepSeekError(f"Stream interrupted: {e}") from e
+
+
+def chat_completion_stream(
+    messages: Iterable[dict[str, Any]],
+    *,
+    config: DeepSeekConfig,
+    temperature: float = 0.2,
+    max_tokens: int = 1200,
+    retries: int = 3,
+    response_format: dict[str, Any] | None = None,
+    deadline: float | None = None,
+) -> Iterator[str]:
+    """Yield content deltas as they arrive (server-sent events).
+
+    Retries cover opening the stream, and a stream that hits ``max_tokens``
+    before any content arrives is restarted with a larger budget, as in
+    ``chat_completion``. Once content has been yielded there is no retry;
+    closing the generator early closes the connection and stops generation.
+
+    ``deadline`` (a ``time.monotonic()`` value) is checked on every event,
+    including reasoning-only ones that yield nothing, and before a restart;
+    past it the stream is closed and ``DeadlineExceeded`` is raised.
+    """
+    url = f"{config.base_url}{config.api_path}"
+    headers = {
+        "Authorization": f"Bearer {config.api_key}",
+        "User-Agent": "thesis-research/0.1",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+    payload_base = {
+        "model": config.model,
+        "messages": list(messages),
+        "temperature": float(temperature),
+        "stream": True,
+    }
+    if response_format is not None:
+        payload_base["response_format"] = response_format
+
+    current_max_tokens = max(1, int(max_tokens))
+    for attempt in range(retries + 1):
+        _check_deadline(deadline)
+        payload = {**payload_base, "max_tokens": current_max_tokens}
+        resp = _open_stream(url, headers, _dumps(payload), timeout_s=config.timeout_s, retries=retries)
+        got_content = False
+        finish_reason = None
+        with resp:
+            for choice in _stream_choices(resp, deadline):
+                finish_reason = choice.get("finish_reason") or finish_reason
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    got_content = True
+                    yield content
+        if got_content:
+            return
+        if finish_reason == "length" and attempt < retries:
+            current_max_tokens = min(max(256, current_max_tokens * 2), 4096)
+            continue
+        raise _empty_content_error(config, finish_reason, " in stream.")
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import email.utils
+import http.client
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from email.message import Message
+from pathlib import Path
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+RETRY_AFTER_MAX_S = 30.0
+# In-flight requests per host across all threads (OpenAlex/arXiv politeness).
+MAX_PER_HOST = 5
+# Requests per second per host; OpenAlex's polite pool allows 10/s.
+RATE_LIMITS: dict[str, float] = {"api.openalex.org": 10.0}
+
+
+def retry_after_s(value: str | None) -> float:
+    """Parse a Retry-After header (delta-seconds or HTTP-date), capped."""
+    if not value:
+        return 0.0
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return 0.0
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=dt.timezone.utc)
+        secs = (when - dt.datetime.now(dt.timezone.utc)).total_seconds()
+    return min(max(0.0, secs), RETRY_AFTER_MAX_S)
+
+
+class HttpError(RuntimeError):
+    def __init__(self, status: int, url: str, body: bytes = b"", headers: Message | None = None) -> None:
+        super().__init__(f"HTTP Error {status}: {url}")
+        self.status = status
+        self.url = url
+        self.body = body
+        self.headers = headers
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    fresh: bool
+
+
+class ResponseCache:
+    """URL-keyed response bodies in SQLite, reused until ``ttl_s`` expires.
+
+    Expired entries that carry an ETag or Last-Modified are kept for up to
+    ``MAX_STALE_S`` so ``get`` can revalidate them with a conditional request.
+    """
+
+    MAX_STALE_S = 7 * 24 * 3600.0
+
+    def __init__(self, path: Path, *, ttl_s: float) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = float(ttl_s)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, body BLOB NOT NULL)"
+            )
+            cols = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+            for col in ("etag", "last_modified"):
+                if col not in cols:
+                    self._db.execute(f"ALTER TABLE responses ADD COLUMN {col} TEXT")
+            self._db.execute(
+                "DELETE FROM responses WHERE fetched_at < ?"
+                " OR (fetched_at < ? AND etag IS NULL AND last_modified IS NULL)",
+                (now - self.MAX_STALE_S, now - self.ttl_s),
+            )
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, body, etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        fetched_at, body, etag, last_modified = row
+        fresh = time.time() - fetched_at <= self.ttl_s
+        if not fresh and not (etag or last_modified):
+            return None
+        return CachedResponse(body=body, etag=etag, last_modified=last_modified, fresh=fresh)
+
+    def put(self, url: str, body: bytes, *, etag: str | None = None, last_modified: str | None = None) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, fetched_at, body, etag, last_modified) VALUES (?, ?, ?, ?, ?)",
+                (url, time.time(), body, etag, last_modified),
+            )
+
+    def touch(self, url: str) -> None:
+        """Mark a revalidated (304) entry fresh again."""
+        with self._lock, self._db:
+            self._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+
+_cache: ResponseCache | None = None
+
+
+def install_cache(cache: ResponseCache | None) -> None:
+    """Route ``get`` through ``cache`` (``None`` disables caching)."""
+    global _cache
+    _cache = cache
+
+
+class _ForwardProxyConnection(http.client.HTTPConnection):
+    """Plain-HTTP connection to a proxy that sends absolute-form request targets."""
+
+    def __init__(self, proxy_netloc: str, origin: str, proxy_headers: dict[str, str], timeout: float) -> None:
+        super().__init__(proxy_netloc, timeout=timeout)
+        self._origin = origin
+        self._proxy_headers = proxy_headers
+
+    def putrequest(self, method: str, url: str, **kwargs) -> None:
+        super().putrequest(method, self._origin + url, **kwargs)
+        for name, value in self._proxy_headers.items():
+            self.putheader(name, value)
+
+
+def _proxy_for(scheme: str, netloc: str) -> tuple[str, dict[str, str]] | None:
+    """Proxy ``host:port`` and auth headers from HTTP(S)_PROXY/NO_PROXY, as urllib would use."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(netloc):
+        return None
+    parts = urllib.parse.urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    if not parts.hostname:
+        return None
+    headers = {}
+    if parts.username is not None:
+        creds = f"{urllib.parse.unquote(parts.username)}:{urllib.parse.unquote(parts.password or '')}"
+        headers["Proxy-Authorization"] = "Basic " + base64.b64encode(creds.encode("utf-8")).decode("ascii")
+    return f"{parts.hostname}:{parts.port or 80}", headers
+
+
+def _new_connection(scheme: str, netloc: str, timeout_s: float) -> http.client.HTTPConnection:
+    proxy = _proxy_for(scheme, netloc)
+    if proxy is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=timeout_s)
+    proxy_netloc, proxy_headers = proxy
+    if scheme == "https":
+        # CONNECT tunnel through the proxy; TLS is still end-to-end with the origin.
+        conn = http.client.HTTPSConnection(proxy_netloc, timeout=timeout_s)
+        conn.set_tunnel(netloc, headers=proxy_headers)
+        return conn
+    return _ForwardProxyConnection(proxy_netloc, f"{scheme}://{netloc}", proxy_headers, timeout_s)
+
+
+def _target(parts: urllib.parse.SplitResult) -> str:
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+
+# Idle keep-alive connections per (scheme, host), shared by all threads.
+# http.client connections are not thread-safe, so each one is checked out for
+# a single request and handed back afterwards; short-lived worker pools reuse
+# them instead of stranding a connection per thread.
+_idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+_idle_lock = threading.Lock()
+
+
+def _checkout(scheme: str, netloc: str, timeout_s: float) -> http.client.HTTPConnection:
+    with _idle_lock:
+        idle = _idle.get((scheme, netloc))
+        conn = idle.pop() if idle else None
+    if conn is None:
+        return _new_connection(scheme, netloc, timeout_s)
+    conn.timeout = timeout_s
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout_s)
+    return conn
+
+
+def _checkin(scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+    with _idle_lock:
+        idle = _idle.setdefault((scheme, netloc), [])
+        if len(idle) < MAX_PER_HOST:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+
+def _host_slot(netloc: str) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        slot = _host_slots.get(netloc)
+        if slot is None:
+            slot = _host_slots[netloc] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return slot
+
+
+class _TokenBucket:
+    def __init__(self, rate: float) -> None:
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Take the token now (possibly going negative) so concurrent
+            # callers queue up behind each other instead of all waking at once.
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            self._tokens -= 1.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+_buckets: dict[str, _TokenBucket] = {}
+
+
+def _throttle(netloc: str) -> None:
+    rate = RATE_LIMITS.get(netloc)
+    if not rate:
+        return
+    with _host_slots_lock:
+        bucket = _buckets.get(netloc)
+        if bucket is None:
+            bucket = _buckets[netloc] = _TokenBucket(rate)
+    bucket.acquire()
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    body: bytes | None = None,
+    timeout_s: float = 60,
+) -> tuple[int, Message, bytes]:
+    """Send one request over a pooled connection, following redirects."""
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        target = _target(parts)
+        _throttle(parts.netloc)
+        with _host_slot(parts.netloc):
+            for attempt in range(2):
+                if attempt:
+                    conn = _new_connection(parts.scheme, parts.netloc, timeout_s)
+                else:
+                    conn = _checkout(parts.scheme, parts.netloc, timeout_s)
+                try:
+                    conn.request(method, target, body=body, headers=headers or {})
+                    resp = conn.getresponse()
+                    data = resp.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # Server dropped an idle keep-alive connection; reconnect once.
+                    conn.close()
+                    if attempt:
+                        raise
+                except BaseException:
+                    conn.close()
+                    raise
+        if resp.will_close:
+            conn.close()
+        else:
+            _checkin(parts.scheme, parts.netloc, conn)
+
+        location = resp.headers.get("Location")
+        if resp.status in REDIRECT_STATUSES and location:
+            url = urllib.parse.urljoin(url, location)
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+            continue
+        return resp.status, resp.headers, data
+    raise HttpError(resp.status, url, data, resp.headers)
+
+
+def get(url: str, *, headers: dict[str, str] | None = None, timeout_s: float = 60, retries: int = 3) -> bytes:
+    cache = _cache
+    cached = cache.lookup(url) if cache is not None else None
+    if cached is not None:
+        if cached.fresh:
+            return cached.body
+        # Stale but validatable: a 304 lets us reuse the stored body.
+        headers = dict(headers or {})
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    for attempt in range(retries + 1):
+        try:
+            status, resp_headers, data = request("GET", url, headers=headers, timeout_s=timeout_s)
+        except (OSError, http.client.HTTPException):
+            if attempt < retries:
+                time.sleep(0.3 * (2**attempt))
+                continue
+            raise
+        # 429/5xx: retry with backoff, or longer if the server asks; others: fail fast
+        if status in RETRY_STATUSES and attempt < retries:
+            time.sleep(max(0.3 * (2**attempt), retry_after_s(resp_headers.get("Retry-After"))))
+            continue
+        if status == 304 and cached is not None:
+            cache.touch(url)
+            return cached.body
+        if status >= 400:
+            raise HttpError(status, url, data, resp_headers)
+        if cache is not None:
+            cache.put(url, data, etag=resp_headers.get("ETag"), last_modified=resp_headers.get("Last-Modified"))
+        return data
+    raise AssertionError("unreachable")
+
+
+def post(url: str, *, headers: dict[str, str] | None = None, body: bytes = b"", timeout_s: float = 60) -> bytes:
+    """POST over a pooled connection; retrying is left to the caller."""
+    status, resp_headers, data = request("POST", url, headers=headers, body=body, timeout_s=timeout_s)
+    if status >= 400:
+        raise HttpError(status, url, data, resp_headers)
+    return data
+
+
+def open_stream(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str] | None = None,
+    body: bytes | None = None,
+    timeout_s: float = 60,
+) -> http.client.HTTPResponse:
+    """Send one request on its own connection and return the unread response.
+
+    For long-lived bodies such as server-sent events: the socket belongs to
+    the response, so closing the response (or leaving its ``with`` block)
+    closes the connection.
+    """
+    parts = urllib.parse.urlsplit(url)
+    conn = _new_connection(parts.scheme, parts.netloc, timeout_s)
+    try:
+        conn.request(method, _target(parts), body=body, headers={**(headers or {}), "Connection": "close"})
+        resp = conn.getresponse()
+    except BaseException:
+        conn.close()
+        raise
+    # Hand the socket to the response. conn.close() would also close a
+    # response the server did not mark "Connection: close", so detach the
+    # socket instead: its real close waits until the response's file is closed.
+    sock, conn.sock = conn.sock, None
+    if sock is not None:
+        sock.close()
+    if resp.status >= 400:
+        with resp:
+            data = resp.read()
+        raise HttpError(resp.status, url, data, resp.headers)
+    return resp
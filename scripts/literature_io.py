@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+from pathlib import Path
+from typing import Any, Iterable
+
+import http_client
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup, stdlib json otherwise
+    orjson = None
+
+
+def jsonl_line(rec: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(rec, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+JSONL_CHUNK_BYTES = 64 * 1024
+
+
+def append_jsonl(path: Path, records: Iterable[dict[str, Any]]) -> int:
+    # Serialize lazily and write in ~64KB chunks: few syscalls, bounded memory
+    # even for --max-results in the thousands.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    buf: list[bytes] = []
+    size = 0
+    with path.open("ab") as f:
+        for rec in records:
+            line = jsonl_line(rec)
+            buf.append(line)
+            size += len(line)
+            n += 1
+            if size >= JSONL_CHUNK_BYTES:
+                f.write(b"".join(buf))
+                buf.clear()
+                size = 0
+        if buf:
+            f.write(b"".join(buf))
+    return n
+
+
+@functools.lru_cache(maxsize=8)
+def _read_text_cached(path_str: str, mtime_ns: int) -> str:
+    # mtime_ns is part of the cache key, so an edited file is re-read.
+    return Path(path_str).read_text(encoding="utf-8")
+
+
+def read_text_cached(path: Path) -> str:
+    return _read_text_cached(str(path), path.stat().st_mtime_ns)
+
+
+# Response cache shared by the literature scripts, relative to the repo root.
+LITERATURE_CACHE_PATH = Path("literature", ".http_cache", "responses.sqlite")
+
+
+def add_cache_args(
+    parser: argparse.ArgumentParser,
+    *,
+    default_ttl_mins: float = 60.0,
+    ttl_help: str = "Reuse cached API responses for this long (0 = no cache)",
+    no_cache_help: str = "Always refetch instead of using literature/.http_cache",
+) -> None:
+    parser.add_argument("--cache-ttl-mins", type=float, default=default_ttl_mins, help=ttl_help)
+    parser.add_argument("--no-cache", action="store_true", help=no_cache_help)
+
+
+def install_cache_from_args(args: argparse.Namespace, cache_path: Path) -> None:
+    """Route http_client.get through ``cache_path`` unless --no-cache or a zero TTL."""
+    if not args.no_cache and args.cache_ttl_mins > 0:
+        http_client.install_cache(http_client.ResponseCache(cache_path, ttl_s=float(args.cache_ttl_mins) * 60.0))
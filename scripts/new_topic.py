@@ -14,11 +14,17 @@ class Topic:
     title: str
 
 
+_NON_SLUG = re.compile(r"[^a-z0-9가-힣\s-]")
+_WHITESPACE = re.compile(r"\s+")
+_DASHES = re.compile(r"-{2,}")
+_TOPIC_DIR = re.compile(r"^(\d{3})-")
+
+
 def slugify(text: str) -> str:
     text = text.strip().lower()
-    text = re.sub(r"[^a-z0-9가-힣\s-]", "", text)
-    text = re.sub(r"\s+", "-", text)
-    text = re.sub(r"-{2,}", "-", text).strip("-")
+    text = _NON_SLUG.sub("", text)
+    text = _WHITESPACE.sub("-", text)
+    text = _DASHES.sub("-", text).strip("-")
     return text or "topic"
 
 
@@ -29,7 +35,7 @@ def next_topic_id(topics_dir: Path) -> int:
     for path in topics_dir.iterdir():
         if not path.is_dir():
             continue
-        match = re.match(r"^(\d{3})-", path.name)
+        match = _TOPIC_DIR.match(path.name)
         if match:
             ids.append(int(match.group(1)))
     return (max(ids) + 1) if ids else 1
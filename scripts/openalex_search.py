@@ -7,42 +7,74 @@ import datetime as dt
 import json
 import time
 import urllib.parse
-import urllib.request
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
-
-
-@dataclass(frozen=True)
-class OpenAlexWork:
-    source: str
-    query: str
-    retrieved_at: str
-    id: str | None
-    doi: str | None
-    title: str | None
-    publication_year: int | None
-    venue: str | None
-    cited_by_count: int | None
-    authors: list[str]
-    url: str | None
-    open_access: str | None
-    abstract: str | None
-
-
-def _get(obj: dict[str, Any], path: str, default: Any = None) -> Any:
-    cur: Any = obj
-    for key in path.split("."):
-        if not isinstance(cur, dict) or key not in cur:
-            return default
-        cur = cur[key]
-    return cur
+from typing import Any, Callable, Iterator
+
+import http_client
+from literature_io import LITERATURE_CACHE_PATH, add_cache_args, append_jsonl, install_cache_from_args
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup, stdlib json otherwise
+    orjson = None
+
+
+def _path(path: str) -> Callable[[Any], Any]:
+    """Compile a dotted key path into a getter; None if any step is missing."""
+    keys = tuple(path.split("."))
+
+    def get(obj: Any) -> Any:
+        for key in keys:
+            if not isinstance(obj, dict):
+                return None
+            obj = obj.get(key)
+        return obj
+
+    return get
+
+
+# Paths read once per work (or page); split once at import.
+_NEXT_CURSOR = _path("meta.next_cursor")
+_AUTHOR_NAME = _path("author.display_name")
+_VENUE = _path("primary_location.source.display_name")
+_OA_STATUS = _path("open_access.oa_status")
 
 
 def fetch_json(url: str, user_agent: str, timeout_s: int = 30) -> dict[str, Any]:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    # Pooled keep-alive connection: later pages skip the TCP/TLS handshake.
+    data = http_client.get(url, headers={"User-Agent": user_agent}, timeout_s=timeout_s)
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+OPENALEX_WORKS_URL = "https://api.openalex.org/works"
+
+
+def user_agent_for(email: str | None) -> str:
+    return "thesis-research/0.1 (mailto:unknown)" if not email else f"thesis-research/0.1 (mailto:{email})"
+
+
+def iter_pages(
+    query: str, *, per_page: int, pages: int, email: str | None = None, sleep_s: float = 0.0
+) -> Iterator[dict[str, Any]]:
+    """Yield up to ``pages`` result payloads, following ``meta.next_cursor``.
+
+    Cursor paging keeps deep pages as cheap as the first one, unlike
+    ``page=N`` offsets.
+    """
+    user_agent = user_agent_for(email)
+    per_page = max(1, min(200, int(per_page)))
+    cursor: str | None = "*"
+    for page in range(max(1, int(pages))):
+        if page and sleep_s > 0:
+            time.sleep(sleep_s)
+        params = {"search": query, "per-page": str(per_page), "cursor": cursor}
+        if email:
+            params["mailto"] = email
+        payload = fetch_json(f"{OPENALEX_WORKS_URL}?{urllib.parse.urlencode(params)}", user_agent=user_agent)
+        yield payload
+        cursor = _NEXT_CURSOR(payload)
+        if not cursor:
+            break
 
 
 def inverted_index_to_text(inv: dict[str, list[int]] | None) -> str | None:
@@ -54,60 +86,41 @@ def inverted_index_to_text(inv: dict[str, list[int]] | None) -> str | None:
             positions[int(i)] = token
     if not positions:
         return None
-    return " ".join(positions[i] for i in sorted(positions.keys())).strip() or None
-
-
-def parse_works(payload: dict[str, Any], *, query: str, retrieved_at: str) -> Iterable[OpenAlexWork]:
+    max_pos = max(positions)
+    if min(positions) < 0 or max_pos >= 2 * len(positions) + 16:
+        # Malformed (negative or very sparse) positions: a dense list could be
+        # huge, so sort instead.
+        return " ".join(positions[i] for i in sorted(positions)).strip() or None
+    # Positions are dense word offsets: fill a list by index instead of sorting.
+    words: list[str | None] = [None] * (max_pos + 1)
+    for i, token in positions.items():
+        words[i] = token
+    return " ".join([w for w in words if w is not None]).strip() or None
+
+
+def parse_works(payload: dict[str, Any], *, query: str, retrieved_at: str) -> Iterator[dict[str, Any]]:
+    """Yield one library JSONL record per work in a results payload."""
     for item in payload.get("results", []) or []:
         authors: list[str] = []
         for auth in (item.get("authorships") or []):
-            name = _get(auth, "author.display_name")
+            name = str(_AUTHOR_NAME(auth) or "").strip()
             if name:
-                authors.append(str(name))
-        abstract = inverted_index_to_text(item.get("abstract_inverted_index"))
-        yield OpenAlexWork(
-            source="openalex",
-            query=query,
-            retrieved_at=retrieved_at,
-            id=item.get("id"),
-            doi=item.get("doi"),
-            title=item.get("display_name"),
-            publication_year=item.get("publication_year"),
-            venue=_get(item, "primary_location.source.display_name"),
-            cited_by_count=item.get("cited_by_count"),
-            authors=authors,
-            url=item.get("id"),
-            open_access=str(_get(item, "open_access.oa_status") or "") or None,
-            abstract=abstract,
-        )
-
-
-def to_jsonl_record(work: OpenAlexWork) -> dict[str, Any]:
-    return {
-        "source": work.source,
-        "query": work.query,
-        "retrieved_at": work.retrieved_at,
-        "id": work.id,
-        "doi": work.doi,
-        "title": work.title,
-        "publication_year": work.publication_year,
-        "venue": work.venue,
-        "cited_by_count": work.cited_by_count,
-        "authors": work.authors,
-        "url": work.url,
-        "open_access": work.open_access,
-        "abstract": work.abstract,
-    }
-
-
-def append_jsonl(path: Path, records: Iterable[dict[str, Any]]) -> int:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    count = 0
-    with path.open("a", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-            count += 1
-    return count
+                authors.append(name)
+        yield {
+            "source": "openalex",
+            "query": query,
+            "retrieved_at": retrieved_at,
+            "id": item.get("id"),
+            "doi": item.get("doi"),
+            "title": item.get("display_name"),
+            "publication_year": item.get("publication_year"),
+            "venue": _VENUE(item),
+            "cited_by_count": item.get("cited_by_count"),
+            "authors": authors,
+            "url": item.get("id"),
+            "open_access": str(_OA_STATUS(item) or "") or None,
+            "abstract": inverted_index_to_text(item.get("abstract_inverted_index")),
+        }
 
 
 def write_csv(path: Path, records: list[dict[str, Any]]) -> None:
@@ -148,33 +161,22 @@ def main() -> int:
         default="",
         help="Optional contact email for polite API usage (sent as mailto param).",
     )
+    add_cache_args(parser)
     args = parser.parse_args()
 
     root = Path(__file__).resolve().parents[1]
+    install_cache_from_args(args, root / LITERATURE_CACHE_PATH)
+
     out_path = (root / args.out).resolve()
     csv_path = (root / args.csv).resolve() if args.csv else None
 
-    per_page = max(1, min(200, int(args.per_page)))
-    pages = max(1, int(args.pages))
-
-    base = "https://api.openalex.org/works"
-    user_agent = "thesis-research/0.1 (mailto:unknown)" if not args.email else f"thesis-research/0.1 (mailto:{args.email})"
     retrieved_at = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
     all_records: list[dict[str, Any]] = []
-    for page in range(1, pages + 1):
-        params = {
-            "search": args.query,
-            "per-page": str(per_page),
-            "page": str(page),
-        }
-        if args.email:
-            params["mailto"] = args.email
-        url = f"{base}?{urllib.parse.urlencode(params)}"
-        payload = fetch_json(url, user_agent=user_agent)
-        works = [to_jsonl_record(w) for w in parse_works(payload, query=args.query, retrieved_at=retrieved_at)]
-        all_records.extend(works)
-        time.sleep(max(0.0, float(args.sleep)))
+    for payload in iter_pages(
+        args.query, per_page=args.per_page, pages=args.pages, email=args.email or None, sleep_s=max(0.0, float(args.sleep))
+    ):
+        all_records.extend(parse_works(payload, query=args.query, retrieved_at=retrieved_at))
 
     count = append_jsonl(out_path, all_records)
     if csv_path:
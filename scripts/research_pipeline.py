@@ -3,17 +3,18 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import heapq
 import json
 import re
-import time
 import urllib.parse
-import urllib.request
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import arxiv_search
+import openalex_search
 from deepseek_client import chat_completion, load_config_from_env
+from literature_io import LITERATURE_CACHE_PATH, add_cache_args, append_jsonl, install_cache_from_args
 
 
 def slugify(text: str) -> str:
@@ -24,93 +25,20 @@ def slugify(text: str) -> str:
     return text or "run"
 
 
-def fetch_json(url: str, user_agent: str, timeout_s: int = 30) -> dict[str, Any]:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def inverted_index_to_text(inv: dict[str, list[int]] | None) -> str | None:
-    if not inv:
-        return None
-    positions: dict[int, str] = {}
-    for token, idxs in inv.items():
-        for i in idxs:
-            positions[int(i)] = token
-    if not positions:
-        return None
-    return " ".join(positions[i] for i in sorted(positions.keys())).strip() or None
-
-
-@dataclass(frozen=True)
-class Paper:
-    source: str
-    title: str | None
-    year: int | None
-    venue: str | None
-    cited_by_count: int | None
-    authors: list[str]
-    url: str | None
-    doi: str | None
-    abstract: str | None
-    summary: str | None  # arXiv summary
-
-
-def search_openalex(query: str, per_page: int, pages: int, email: str | None) -> list[Paper]:
-    base = "https://api.openalex.org/works"
-    ua = "thesis-research/0.1 (mailto:unknown)" if not email else f"thesis-research/0.1 (mailto:{email})"
-    per_page = max(1, min(200, int(per_page)))
-    pages = max(1, int(pages))
-
-    out: list[Paper] = []
-    for page in range(1, pages + 1):
-        params = {"search": query, "per-page": str(per_page), "page": str(page)}
-        if email:
-            params["mailto"] = email
-        url = f"{base}?{urllib.parse.urlencode(params)}"
-        payload = fetch_json(url, user_agent=ua)
-        for item in payload.get("results", []) or []:
-            authors = []
-            for auth in (item.get("authorships") or []):
-                name = ((auth.get("author") or {}).get("display_name") or "").strip()
-                if name:
-                    authors.append(name)
-            abstract = inverted_index_to_text(item.get("abstract_inverted_index"))
-            out.append(
-                Paper(
-                    source="openalex",
-                    title=item.get("display_name"),
-                    year=item.get("publication_year"),
-                    venue=(((((item.get("primary_location") or {}).get("source") or {}).get("display_name")) or None)),
-                    cited_by_count=item.get("cited_by_count"),
-                    authors=authors,
-                    url=item.get("id"),
-                    doi=item.get("doi"),
-                    abstract=abstract,
-                    summary=None,
-                )
-            )
-        time.sleep(0.2)
+def search_openalex(query: str, per_page: int, pages: int, email: str | None, *, retrieved_at: str) -> list[dict[str, Any]]:
+    out: list[dict[str, Any]] = []
+    # No fixed sleep between pages: http_client already rate-limits api.openalex.org.
+    for payload in openalex_search.iter_pages(query, per_page=per_page, pages=pages, email=email):
+        for w in openalex_search.parse_works(payload, query=query, retrieved_at=retrieved_at):
+            # parse_works already yields library records: normalize venue and
+            # add the summary slot arXiv records carry instead of copying.
+            w["venue"] = w["venue"] or None
+            w["summary"] = None
+            out.append(w)
     return out
 
 
-ATOM_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
-
-
-def fetch_xml(url: str, user_agent: str, timeout_s: int = 30) -> str:
-    req = urllib.request.Request(url, headers={"User-Agent": user_agent})
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        return resp.read().decode("utf-8")
-
-
-def text_or_none(elem: ET.Element | None) -> str | None:
-    if elem is None or elem.text is None:
-        return None
-    t = elem.text.strip()
-    return t or None
-
-
-def search_arxiv(query: str, max_results: int) -> list[Paper]:
+def search_arxiv(query: str, max_results: int, *, retrieved_at: str) -> list[dict[str, Any]]:
     base = "http://export.arxiv.org/api/query"
     search_query = f'all:"{query}"'
     params = {
@@ -121,65 +49,31 @@ def search_arxiv(query: str, max_results: int) -> list[Paper]:
         "sortOrder": "descending",
     }
     url = f"{base}?{urllib.parse.urlencode(params)}"
-    xml_text = fetch_xml(url, user_agent="thesis-research/0.1")
-    root = ET.fromstring(xml_text)
-
-    out: list[Paper] = []
-    for entry in root.findall("atom:entry", ATOM_NS):
-        authors = [text_or_none(a.find("atom:name", ATOM_NS)) for a in entry.findall("atom:author", ATOM_NS)]
-        authors = [a for a in authors if a]
-        links = entry.findall("atom:link", ATOM_NS)
-        url_html = None
-        for link in links:
-            if link.attrib.get("rel") == "alternate" and link.attrib.get("type") == "text/html":
-                url_html = link.attrib.get("href")
-                break
-
-        out.append(
-            Paper(
-                source="arxiv",
-                title=text_or_none(entry.find("atom:title", ATOM_NS)),
-                year=None,
-                venue="arXiv",
-                cited_by_count=None,
-                authors=authors,
-                url=url_html,
-                doi=None,
-                abstract=None,
-                summary=text_or_none(entry.find("atom:summary", ATOM_NS)),
-            )
-        )
-    return out
-
-
-def to_library_record(p: Paper, *, query: str) -> dict[str, Any]:
-    return {
-        "source": p.source,
-        "query": query,
-        "retrieved_at": dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
-        "title": p.title,
-        "publication_year": p.year,
-        "venue": p.venue,
-        "cited_by_count": p.cited_by_count,
-        "doi": p.doi,
-        "url": p.url,
-        "authors": p.authors,
-        "abstract": p.abstract,
-        "summary": p.summary,
-    }
-
-
-def append_jsonl(path: Path, records: list[dict[str, Any]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-
-def rank(p: Paper) -> tuple[int, int, int]:
-    year = int(p.year or 0)
-    cited = int(p.cited_by_count or 0)
-    has_text = 1 if (p.abstract or p.summary) else 0
+    xml = arxiv_search.fetch_xml(url, user_agent="thesis-research/0.1")
+    # Same streaming parser as arxiv_search (lxml when installed).
+    return [
+        {
+            "source": "arxiv",
+            "query": query,
+            "retrieved_at": retrieved_at,
+            "title": rec["title"],
+            "publication_year": None,
+            "venue": "arXiv",
+            "cited_by_count": None,
+            "doi": rec["doi"],
+            "url": rec["url"],
+            "authors": rec["authors"],
+            "abstract": None,
+            "summary": rec["summary"],
+        }
+        for rec in arxiv_search.parse_feed(xml)
+    ]
+
+
+def rank(p: dict[str, Any]) -> tuple[int, int, int]:
+    year = int(p["publication_year"] or 0)
+    cited = int(p["cited_by_count"] or 0)
+    has_text = 1 if (p["abstract"] or p["summary"]) else 0
     return (has_text, cited, year)
 
 
@@ -192,38 +86,52 @@ def main() -> int:
     parser.add_argument("--arxiv-max", type=int, default=30)
     parser.add_argument("--top-n", type=int, default=12, help="How many papers to pass into the LLM")
     parser.add_argument("--email", default="", help="Optional email for OpenAlex mailto param")
+    add_cache_args(parser)
     args = parser.parse_args()
 
     root = Path(__file__).resolve().parents[1]
+    install_cache_from_args(args, root / LITERATURE_CACHE_PATH)
+
     topic_dir = (root / args.topic).resolve()
     if not topic_dir.exists():
         raise SystemExit(f"topic folder not found: {topic_dir}")
 
     cfg = load_config_from_env()
 
-    papers: list[Paper] = []
-    papers.extend(search_openalex(args.query, per_page=args.openalex_per_page, pages=args.openalex_pages, email=args.email or None))
-    papers.extend(search_arxiv(args.query, max_results=args.arxiv_max))
+    # Different hosts, so the two searches overlap instead of adding latencies.
+    # Results are library records already: no per-paper intermediate objects.
+    retrieved_at = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        openalex = pool.submit(
+            search_openalex,
+            args.query,
+            per_page=args.openalex_per_page,
+            pages=args.openalex_pages,
+            email=args.email or None,
+            retrieved_at=retrieved_at,
+        )
+        arxiv = pool.submit(search_arxiv, args.query, max_results=args.arxiv_max, retrieved_at=retrieved_at)
+        papers = [*openalex.result(), *arxiv.result()]
 
     # Save library snapshot (append-only)
     library_path = root / "literature" / "library.jsonl"
-    append_jsonl(library_path, [to_library_record(p, query=args.query) for p in papers])
+    append_jsonl(library_path, papers)
 
-    selected = sorted(papers, key=rank, reverse=True)[: max(1, int(args.top_n))]
+    selected = heapq.nlargest(max(1, int(args.top_n)), papers, key=rank)
     items = []
     for i, p in enumerate(selected, start=1):
         items.append(
             {
                 "n": i,
-                "source": p.source,
-                "title": p.title,
-                "year": p.year,
-                "venue": p.venue,
-                "cited_by_count": p.cited_by_count,
-                "authors": p.authors[:8],
-                "url": p.url,
-                "doi": p.doi,
-                "abstract_or_summary": (p.abstract or p.summary or "")[:2000],
+                "source": p["source"],
+                "title": p["title"],
+                "year": p["publication_year"],
+                "venue": p["venue"],
+                "cited_by_count": p["cited_by_count"],
+                "authors": p["authors"][:8],
+                "url": p["url"],
+                "doi": p["doi"],
+                "abstract_or_summary": (p["abstract"] or p["summary"] or "")[:2000],
             }
         )
 
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import functools
 import math
 import random
-from dataclasses import dataclass
-from typing import Callable
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+DEMAND_HISTORY_DAYS = 365
 
 
 def clamp_int(x: float, lo: int = 0, hi: int = 10**9) -> int:
@@ -18,17 +22,42 @@ def sample_poisson(lam: float, rng: random.Random) -> int:
     if lam < 50.0:
         # Knuth
         L = math.exp(-lam)
+        rand = rng.random
         k = 0
         p = 1.0
         while p > L:
             k += 1
-            p *= rng.random()
+            p *= rand()
         return k - 1
     # Normal approximation for large lambda
     x = rng.gauss(lam, math.sqrt(lam))
     return max(0, int(x))
 
 
+def sample_poisson_series(lams: Iterable[float], rng: random.Random) -> list[int]:
+    """One draw per rate, same rng stream as calling sample_poisson in order.
+
+    Knuth's loop is inlined for the common small-lambda case to skip a
+    Python call per day when drawing a whole demand horizon.
+    """
+    rand = rng.random
+    exp = math.exp
+    out: list[int] = []
+    for lam in lams:
+        lam = float(lam)
+        if 0.0 < lam < 50.0:
+            L = exp(-lam)
+            k = 0
+            p = 1.0
+            while p > L:
+                k += 1
+                p *= rand()
+            out.append(k - 1)
+        else:
+            out.append(sample_poisson(lam, rng))
+    return out
+
+
 def inv_norm_cdf(p: float) -> float:
     # Peter John Acklam's inverse normal CDF approximation.
     p = float(p)
@@ -61,11 +90,17 @@ def inv_norm_cdf(p: float) -> float:
     )
 
 
+@functools.lru_cache(maxsize=256)
+def service_level_z(service_level: float) -> float:
+    # Policies ask for the same target service level every day.
+    return inv_norm_cdf(min(0.999999, max(1e-6, service_level)))
+
+
 def approx_poisson_quantile(mu: float, service_level: float) -> int:
     mu = max(0.0, float(mu))
     if mu == 0.0:
         return 0
-    z = inv_norm_cdf(min(0.999999, max(1e-6, float(service_level))))
+    z = service_level_z(float(service_level))
     return max(0, int(round(mu + z * math.sqrt(mu))))
 
 
@@ -121,14 +156,18 @@ class EpisodeResult:
 
 @dataclass
 class InventoryState:
+    # Ring buffers, mutated in place by step_inventory.
     day: int
-    on_hand_by_age: list[int]  # index 0 = oldest (expires next), last = freshest
-    pipeline: list[int]  # length lead_time_days; pipeline[0] arrives today
-    demand_history: list[int]
+    on_hand_by_age: deque[int]  # index 0 = oldest (expires next), last = freshest
+    pipeline: deque[int]  # length lead_time_days; pipeline[0] arrives today
+    demand_history: deque[int]  # last DEMAND_HISTORY_DAYS days
+    # Incremental per-policy bookkeeping carried across days, keyed by policy.
+    policy_cache: dict[str, Any] = field(default_factory=dict)
+    # Running sum of on_hand_by_age, kept current by step_inventory.
+    on_hand_total: int = field(init=False)
 
-    @property
-    def on_hand_total(self) -> int:
-        return sum(self.on_hand_by_age)
+    def __post_init__(self) -> None:
+        self.on_hand_total = sum(self.on_hand_by_age)
 
 
 def step_inventory(
@@ -140,24 +179,22 @@ def step_inventory(
     lead_time_days: int,
     costs: Costs,
 ) -> tuple[InventoryState, StepMetrics]:
-    on_hand_by_age = list(state.on_hand_by_age)
-    pipeline = list(state.pipeline)
+    on_hand_by_age = state.on_hand_by_age
+    pipeline = state.pipeline
+    # Validate before mutating anything, so a bad state is left untouched.
+    if len(on_hand_by_age) != shelf_life_days:
+        raise ValueError("on_hand_by_age length mismatch")
 
-    received = pipeline[0] if pipeline else 0
     if lead_time_days > 0:
-        pipeline = pipeline[1:] + [max(0, int(order_qty))]
+        received = pipeline.popleft() if pipeline else 0
+        pipeline.append(max(0, int(order_qty)))
     else:
-        received += max(0, int(order_qty))
-
-    # Age inventory: drop expired bucket, shift others older
-    wasted = 0
-    if len(on_hand_by_age) != shelf_life_days:
-        raise ValueError("on_hand_by_age length mismatch")
-    wasted += on_hand_by_age[0]
-    on_hand_by_age = on_hand_by_age[1:] + [0]
+        received = max(0, int(order_qty))
 
-    # Add received as freshest
-    on_hand_by_age[-1] += received
+    # Age inventory: drop expired bucket, shift others older,
+    # and add received as the freshest bucket.
+    wasted = on_hand_by_age.popleft()
+    on_hand_by_age.append(received)
 
     remaining_demand = max(0, int(demand))
     sold = 0
@@ -170,28 +207,26 @@ def step_inventory(
             break
     stockout = remaining_demand
 
-    holding_cost = costs.holding_cost * sum(on_hand_by_age)
+    on_hand_end = state.on_hand_total - wasted + received - sold
+    state.on_hand_total = on_hand_end
+
+    holding_cost = costs.holding_cost * on_hand_end
     waste_cost = costs.waste_cost * wasted
     stockout_cost = costs.stockout_cost * stockout
 
-    next_history = (state.demand_history + [int(demand)])[-365:]
-    next_state = InventoryState(
-        day=state.day + 1,
-        on_hand_by_age=on_hand_by_age,
-        pipeline=pipeline if lead_time_days > 0 else [],
-        demand_history=next_history,
-    )
+    state.demand_history.append(int(demand))
+    state.day += 1
     metrics = StepMetrics(
         demand=int(demand),
         sold=sold,
         stockout=stockout,
         wasted=wasted,
-        on_hand_end=sum(on_hand_by_age),
+        on_hand_end=on_hand_end,
         holding_cost=holding_cost,
         waste_cost=waste_cost,
         stockout_cost=stockout_cost,
     )
-    return next_state, metrics
+    return state, metrics
 
 
 def run_episode(
@@ -204,53 +239,54 @@ def run_episode(
     rng = random.Random(int(rng_seed))
     state = InventoryState(
         day=0,
-        on_hand_by_age=[0 for _ in range(cfg.shelf_life_days)],
-        pipeline=[0 for _ in range(cfg.lead_time_days)] if cfg.lead_time_days > 0 else [],
-        demand_history=[],
+        on_hand_by_age=deque([0] * cfg.shelf_life_days),
+        pipeline=deque([0] * max(0, cfg.lead_time_days)),
+        demand_history=deque(maxlen=DEMAND_HISTORY_DAYS),
     )
 
-    totals = {
-        "demand": 0,
-        "sold": 0,
-        "stockout": 0,
-        "wasted": 0,
-        "received": 0,
-        "cost": 0.0,
-    }
-
-    for t in range(cfg.horizon_days):
+    # Hoist loop invariants and keep running totals in locals: this loop runs
+    # once per simulated day for every (policy, seed) pair in a sweep.
+    horizon_days = cfg.horizon_days
+    shelf_life_days = cfg.shelf_life_days
+    lead_time_days = cfg.lead_time_days
+    costs = cfg.costs
+    pipeline = state.pipeline
+    total_demand = total_sold = total_stockout = total_wasted = total_received = 0
+    total_cost = 0.0
+
+    for t in range(horizon_days):
         demand = int(demand_fn(t))
         order_qty = int(policy_fn(state))
-        pre_received = state.pipeline[0] if state.pipeline else 0
-        if cfg.lead_time_days == 0:
-            pre_received += max(0, order_qty)
+        if lead_time_days == 0:
+            total_received += max(0, order_qty)
+        elif pipeline:
+            total_received += pipeline[0]
 
         state, m = step_inventory(
             state,
             demand=demand,
             order_qty=order_qty,
-            shelf_life_days=cfg.shelf_life_days,
-            lead_time_days=cfg.lead_time_days,
-            costs=cfg.costs,
+            shelf_life_days=shelf_life_days,
+            lead_time_days=lead_time_days,
+            costs=costs,
         )
 
-        totals["demand"] += m.demand
-        totals["sold"] += m.sold
-        totals["stockout"] += m.stockout
-        totals["wasted"] += m.wasted
-        totals["received"] += pre_received
-        totals["cost"] += m.holding_cost + m.waste_cost + m.stockout_cost
+        total_demand += m.demand
+        total_sold += m.sold
+        total_stockout += m.stockout
+        total_wasted += m.wasted
+        total_cost += m.holding_cost + m.waste_cost + m.stockout_cost
 
         # randomize: small perturbation by shuffling policy noise if needed later
         _ = rng.random()
 
     # Ignore warmup for metrics by shrinking horizon? Keep simple for now: warmup is encoded in policy history windows.
     return EpisodeResult(
-        total_demand=int(totals["demand"]),
-        total_sold=int(totals["sold"]),
-        total_stockout=int(totals["stockout"]),
-        total_wasted=int(totals["wasted"]),
-        total_received=int(totals["received"]),
-        total_cost=float(totals["cost"]),
+        total_demand=total_demand,
+        total_sold=total_sold,
+        total_stockout=total_stockout,
+        total_wasted=total_wasted,
+        total_received=total_received,
+        total_cost=total_cost,
     )
 
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import bisect
 import math
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import islice
 
-from inventory_sim import InventoryState, approx_poisson_quantile
+from inventory_sim import DEMAND_HISTORY_DAYS, InventoryState, approx_poisson_quantile
+
+
+def tail(xs: Sequence[int], n: int) -> list[int]:
+    """Last ``n`` items as a list (demand history is a deque, which can't be sliced)."""
+    return list(islice(xs, max(0, len(xs) - n), None))
 
 
 def mean(xs: list[int]) -> float:
@@ -17,9 +26,11 @@ def ewma(xs: list[int], alpha: float) -> float:
     if not xs:
         return 0.0
     alpha = max(0.0, min(1.0, float(alpha)))
-    m = float(xs[0])
-    for x in xs[1:]:
-        m = alpha * float(x) + (1.0 - alpha) * m
+    beta = 1.0 - alpha
+    it = iter(xs)
+    m = float(next(it))
+    for x in it:
+        m = alpha * x + beta * m
     return m
 
 
@@ -38,48 +49,91 @@ def _base_stock_order_qty(state: InventoryState, target_stock: int) -> int:
 
 
 def baseline_ma_base_stock(state: InventoryState, cfg: PolicyConfig) -> int:
-    hist = (state.demand_history or [])[-max(1, int(cfg.history_window)) :]
+    hist = tail(state.demand_history, max(1, int(cfg.history_window)))
     mu = mean(hist)
     target_stock = approx_poisson_quantile(mu, cfg.service_level_target)
     return _base_stock_order_qty(state, target_stock)
 
 
 def baseline_ewma_base_stock(state: InventoryState, cfg: PolicyConfig) -> int:
-    hist = (state.demand_history or [])[-max(2, int(cfg.history_window)) :]
+    hist = tail(state.demand_history, max(2, int(cfg.history_window)))
     mu = ewma(hist, cfg.ewma_alpha)
     target_stock = approx_poisson_quantile(mu, cfg.service_level_target)
     return _base_stock_order_qty(state, target_stock)
 
 
+@dataclass
+class _ResidualWindow:
+    """Last ``resid_window`` one-step EWMA residuals, kept in arrival and sorted order.
+
+    A day's residual only depends on demand up to that day, so each one is
+    computed once and the sorted copy is updated with one insert/delete per day.
+    """
+
+    params: tuple[int, float, int]
+    next_day: int = 1  # day 0 has no history to forecast from
+    recent: deque[float] = field(default_factory=deque)
+    ordered: list[float] = field(default_factory=list)
+
+    def update(self, hist: Sequence[int], day: int) -> None:
+        window, alpha, resid_window = self.params
+        first = max(self.next_day, day - resid_window)
+        if first >= day:
+            return
+        items = tail(hist, window + (day - first))
+        for d in range(first, day):
+            i = len(items) - (day - d)
+            resid = float(items[i]) - ewma(items[max(0, i - window) : i], alpha)
+            if len(self.recent) == resid_window:
+                old = self.recent.popleft()
+                del self.ordered[bisect.bisect_left(self.ordered, old)]
+            self.recent.append(resid)
+            bisect.insort(self.ordered, resid)
+        self.next_day = day
+
+
+def _sorted_residuals(hist: Sequence[int], window: int, alpha: float, resid_window: int) -> list[float]:
+    """Recompute the last ``resid_window`` one-step EWMA residuals from scratch, sorted."""
+    hist = list(hist)
+    resids = []
+    start = max(0, len(hist) - resid_window)
+    for i in range(start, len(hist)):
+        past = hist[max(0, i - window) : i]
+        if not past:
+            continue
+        resids.append(float(hist[i]) - ewma(past, alpha))
+    return sorted(resids)
+
+
 def cq_base_stock(state: InventoryState, cfg: PolicyConfig) -> int:
     # Conformal-like residual calibration:
     # mean forecast (EWMA) + empirical residual quantile adjustment.
-    hist = state.demand_history or []
     window = max(5, int(cfg.history_window))
     resid_window = max(10, int(cfg.residual_window))
 
-    recent = hist[-window:]
+    recent = tail(state.demand_history, window)
     mu = ewma(recent, cfg.ewma_alpha)
 
-    # Build residuals on last resid_window points using a simple rolling mean forecast proxy.
-    resids: list[float] = []
-    # Avoid expensive loops early.
-    start = max(0, len(hist) - resid_window)
-    for i in range(start, len(hist)):
-        past = hist[max(0, i - window) : i]
-        if not past:
-            continue
-        pred = ewma(past, cfg.ewma_alpha)
-        resids.append(float(hist[i]) - pred)
-
-    if not resids:
+    # Residuals on the last resid_window days against a rolling EWMA forecast proxy.
+    if window + resid_window <= DEMAND_HISTORY_DAYS:
+        params = (window, cfg.ewma_alpha, resid_window)
+        resids = state.policy_cache.get("cq_base_stock")
+        if resids is None or resids.params != params:
+            resids = state.policy_cache["cq_base_stock"] = _ResidualWindow(params)
+        resids.update(state.demand_history, state.day)
+        resids_sorted = resids.ordered
+    else:
+        # The oldest forecasts would reach past the retained history, so their
+        # residuals change as days drop off it: recompute them every day.
+        resids_sorted = _sorted_residuals(state.demand_history, window, cfg.ewma_alpha, resid_window)
+
+    if not resids_sorted:
         target_stock = approx_poisson_quantile(mu, cfg.service_level_target)
         return _base_stock_order_qty(state, target_stock)
 
     # Empirical quantile of residuals at desired service level.
     q = float(cfg.service_level_target)
     q = min(0.999, max(0.001, q))
-    resids_sorted = sorted(resids)
     idx = int(math.ceil(q * len(resids_sorted))) - 1
     idx = max(0, min(len(resids_sorted) - 1, idx))
     adj = resids_sorted[idx]
@@ -87,4 +141,3 @@ def cq_base_stock(state: InventoryState, cfg: PolicyConfig) -> int:
     calibrated_mu = max(0.0, mu + adj)
     target_stock = approx_poisson_quantile(calibrated_mu, cfg.service_level_target)
     return _base_stock_order_qty(state, target_stock)
-
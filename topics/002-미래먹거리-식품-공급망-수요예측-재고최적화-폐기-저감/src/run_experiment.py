@@ -2,13 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import math
-from dataclasses import asdict
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 from typing import Any, Callable
 
-from inventory_sim import Costs, EpisodeResult, SimConfig, run_episode, sample_poisson
+from inventory_sim import Costs, EpisodeResult, InventoryState, SimConfig, run_episode, sample_poisson, sample_poisson_series
 from policies import PolicyConfig, baseline_ewma_base_stock, baseline_ma_base_stock, cq_base_stock
 
 
@@ -22,49 +26,167 @@ def parse_seeds(text: str) -> list[int]:
     return out
 
 
-def build_demand_fn(cfg: dict[str, Any], *, seed: int) -> Callable[[int], int]:
+@dataclass(frozen=True)
+class DemandModelConfig:
+    type: str = "poisson"
+    lambda_start: float = 20.0
+    lambda_end: float = 25.0
+
+
+@dataclass(frozen=True)
+class ExperimentConfig:
+    """Experiment JSON parsed once into typed fields; builders read attributes."""
+
+    sim: SimConfig
+    demand_model: DemandModelConfig
+    policy_name: str
+    policy: PolicyConfig
+
+
+def parse_config(cfg: dict[str, Any]) -> ExperimentConfig:
     dm = cfg.get("demand_model") or {}
-    typ = (dm.get("type") or "poisson").strip()
+    pol = cfg.get("policy") or {}
+    return ExperimentConfig(
+        sim=build_sim_config(cfg),
+        demand_model=DemandModelConfig(
+            type=(dm.get("type") or "poisson").strip(),
+            lambda_start=float(dm.get("lambda_start", 20.0)),
+            lambda_end=float(dm.get("lambda_end", 25.0)),
+        ),
+        policy_name=(pol.get("name") or "baseline_ma_base_stock").strip(),
+        policy=PolicyConfig(
+            service_level_target=float(pol.get("service_level_target", 0.95)),
+            history_window=int(pol.get("history_window", 28)),
+            ewma_alpha=float(pol.get("ewma_alpha", 0.2)),
+            residual_window=int(pol.get("residual_window", 60)),
+        ),
+    )
 
-    if typ == "poisson_drift":
-        lam0 = float(dm.get("lambda_start", 20.0))
-        lam1 = float(dm.get("lambda_end", 25.0))
-        horizon = int(cfg.get("horizon_days", 180))
 
-        import random
+# Weekly seasonality bump: multiplier by day of week (t % 7).
+WEEKLY_SEASONALITY = tuple(1.0 + 0.15 * math.sin(2.0 * math.pi * k / 7.0) for k in range(7))
 
-        rng = random.Random(seed + 1337)
 
-        def fn(t: int) -> int:
-            frac = 0.0 if horizon <= 1 else min(1.0, max(0.0, t / (horizon - 1)))
-            lam = lam0 + (lam1 - lam0) * frac
-            # Weekly seasonality bump
-            lam *= 1.0 + 0.15 * math.sin(2.0 * math.pi * (t % 7) / 7.0)
-            return sample_poisson(lam, rng)
+@dataclass(frozen=True)
+class DemandSpec:
+    """Seed-invariant part of the poisson_drift demand model."""
 
-        return fn
+    lambda_start: float
+    lambda_end: float
+    horizon_days: int
+    rates: tuple[float, ...]  # Poisson rate for each day of the horizon
 
-    raise ValueError(f"unknown demand_model.type: {typ}")
+    def rate(self, t: int) -> float:
+        horizon = self.horizon_days
+        frac = 0.0 if horizon <= 1 else min(1.0, max(0.0, t / (horizon - 1)))
+        lam = self.lambda_start + (self.lambda_end - self.lambda_start) * frac
+        return lam * WEEKLY_SEASONALITY[t % 7]
 
 
-def build_policy_fn(cfg: dict[str, Any]) -> Callable:
-    pol = cfg.get("policy") or {}
-    name = (pol.get("name") or "baseline_ma_base_stock").strip()
-    pcfg = PolicyConfig(
-        service_level_target=float(pol.get("service_level_target", 0.95)),
-        history_window=int(pol.get("history_window", 28)),
-        ewma_alpha=float(pol.get("ewma_alpha", 0.2)),
-        residual_window=int(pol.get("residual_window", 60)),
+@functools.lru_cache(maxsize=32)
+def demand_spec(dm: DemandModelConfig, horizon_days: int) -> DemandSpec:
+    # Cached so every seed of a config (in a worker, too) shares one rate table.
+    if dm.type != "poisson_drift":
+        raise ValueError(f"unknown demand_model.type: {dm.type}")
+    spec = DemandSpec(dm.lambda_start, dm.lambda_end, horizon_days, rates=())
+    return replace(spec, rates=tuple(map(spec.rate, range(horizon_days))))
+
+
+def make_demand_fn(spec: DemandSpec, *, seed: int) -> Callable[[int], int]:
+    rng = random.Random(seed + 1337)
+    # Draw the whole horizon up front (same rng order as day-by-day calls),
+    # so the episode loop only does a list lookup per day.
+    series = sample_poisson_series(spec.rates, rng)
+
+    def fn(t: int) -> int:
+        if 0 <= t < len(series):
+            return series[t]
+        return sample_poisson(spec.rate(t), rng)
+
+    return fn
+
+
+def build_demand_fn(exp: ExperimentConfig, *, seed: int) -> Callable[[int], int]:
+    return make_demand_fn(demand_spec(exp.demand_model, exp.sim.horizon_days), seed=seed)
+
+
+POLICIES: dict[str, Callable[[InventoryState, PolicyConfig], int]] = {
+    "baseline_ma_base_stock": baseline_ma_base_stock,
+    "baseline_ewma_base_stock": baseline_ewma_base_stock,
+    "cq_base_stock": cq_base_stock,
+}
+
+
+def build_policy_fn(exp: ExperimentConfig) -> Callable[[InventoryState], int]:
+    policy = POLICIES.get(exp.policy_name)
+    if policy is None:
+        raise ValueError(f"unknown policy.name: {exp.policy_name}")
+    return functools.partial(policy, cfg=exp.policy)
+
+
+# (key, type, default) for the SimConfig fields and its "costs" block.
+SIM_FIELDS: tuple[tuple[str, type, Any], ...] = (
+    ("horizon_days", int, 180),
+    ("warmup_days", int, 30),
+    ("shelf_life_days", int, 7),
+    ("lead_time_days", int, 1),
+)
+COST_FIELDS: tuple[tuple[str, type, Any], ...] = (
+    ("waste_cost", float, 1.0),
+    ("stockout_cost", float, 3.0),
+    ("holding_cost", float, 0.05),
+)
+
+
+def _parse_fields(src: dict[str, Any], schema: tuple[tuple[str, type, Any], ...]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for key, typ, default in schema:
+        value = src.get(key, default)
+        try:
+            out[key] = typ(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"invalid {key}: {value!r}") from e
+    return out
+
+
+def build_sim_config(cfg: dict[str, Any]) -> SimConfig:
+    costs = Costs(**_parse_fields(cfg.get("costs") or {}, COST_FIELDS))
+    return SimConfig(**_parse_fields(cfg, SIM_FIELDS), costs=costs)
+
+
+def _run_one(job: tuple[ExperimentConfig, int]) -> EpisodeResult:
+    # Module-level so it pickles: the demand/policy closures are rebuilt in the worker.
+    exp, seed = job
+    return run_episode(
+        cfg=exp.sim,
+        demand_fn=build_demand_fn(exp, seed=seed),
+        policy_fn=build_policy_fn(exp),
+        rng_seed=seed,
     )
 
-    if name == "baseline_ma_base_stock":
-        return lambda state: baseline_ma_base_stock(state, pcfg)
-    if name == "baseline_ewma_base_stock":
-        return lambda state: baseline_ewma_base_stock(state, pcfg)
-    if name == "cq_base_stock":
-        return lambda state: cq_base_stock(state, pcfg)
 
-    raise ValueError(f"unknown policy.name: {name}")
+def run_sweep(
+    exps: list[ExperimentConfig],
+    seeds: list[int],
+    policies: list[str] | None = None,
+    *,
+    max_workers: int | None = None,
+) -> list[EpisodeResult]:
+    """Run every config (x policy name, if given) x seed episode in worker processes.
+
+    Episodes are independent CPU-bound Python, so processes rather than threads.
+    Results come back in input order: configs, then policies, then seeds.
+    """
+    jobs: list[tuple[ExperimentConfig, int]] = []
+    for exp in exps:
+        variants = [replace(exp, policy_name=name) for name in policies] if policies else [exp]
+        jobs.extend((variant, seed) for variant in variants for seed in seeds)
+
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [_run_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_one, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
 
 
 def summarize(result: EpisodeResult) -> dict[str, Any]:
@@ -80,46 +202,47 @@ def summarize(result: EpisodeResult) -> dict[str, Any]:
     }
 
 
+def run(cfg: dict[str, Any], seeds: list[int], out: Path, *, max_workers: int | None = None) -> Path:
+    """Run one experiment config over ``seeds`` and write JSONL results to ``out``.
+
+    The CLI is a thin wrapper around this; sweep drivers can call it directly
+    with in-memory configs.
+    """
+    exp = parse_config(cfg)
+    build_policy_fn(exp)  # fail fast on a bad policy name before starting workers
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    # Seeds are independent episodes; run_sweep keeps results in seed order.
+    results = run_sweep([exp], seeds, max_workers=max_workers)
+
+    # config/sim_cfg are the same for every seed: serialize them once. The line
+    # matches json.dumps of the whole {"seed", "config", "sim_cfg", "metrics"} record.
+    shared = (
+        f', "config": {json.dumps(cfg, ensure_ascii=False)}'
+        f', "sim_cfg": {json.dumps(asdict(exp.sim), ensure_ascii=False)}'
+        ', "metrics": '
+    ).encode("utf-8")
+    # Binary mode: bytes go straight to the buffer without a text codec layer.
+    with out.open("wb") as f:
+        for seed, result in zip(seeds, results):
+            metrics = json.dumps(summarize(result), ensure_ascii=False).encode("utf-8")
+            f.write(b'{"seed": %d%s%s}\n' % (seed, shared, metrics))
+    return out
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run perishable inventory experiments and write JSONL results.")
     parser.add_argument("--config", required=True, help="Path to experiment JSON config")
     parser.add_argument("--seeds", default="0,1,2,3,4", help="Comma-separated random seeds")
     parser.add_argument("--out", default="results/run.jsonl", help="Output JSONL path")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for the seed sweep (0 = all cores)")
     args = parser.parse_args()
 
     cfg_path = Path(args.config)
-    cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
-
-    costs_cfg = cfg.get("costs") or {}
-    sim_cfg = SimConfig(
-        horizon_days=int(cfg.get("horizon_days", 180)),
-        warmup_days=int(cfg.get("warmup_days", 30)),
-        shelf_life_days=int(cfg.get("shelf_life_days", 7)),
-        lead_time_days=int(cfg.get("lead_time_days", 1)),
-        costs=Costs(
-            waste_cost=float(costs_cfg.get("waste_cost", 1.0)),
-            stockout_cost=float(costs_cfg.get("stockout_cost", 3.0)),
-            holding_cost=float(costs_cfg.get("holding_cost", 0.05)),
-        ),
-    )
-    policy_fn = build_policy_fn(cfg)
-
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    seeds = parse_seeds(args.seeds)
-
-    with out_path.open("w", encoding="utf-8") as f:
-        for seed in seeds:
-            demand_fn = build_demand_fn(cfg, seed=seed)
-            result = run_episode(cfg=sim_cfg, demand_fn=demand_fn, policy_fn=policy_fn, rng_seed=seed)
-            rec = {
-                "seed": seed,
-                "config": cfg,
-                "sim_cfg": asdict(sim_cfg),
-                "metrics": summarize(result),
-            }
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    cfg = json.loads(cfg_path.read_bytes())
 
+    out_path = run(cfg, parse_seeds(args.seeds), Path(args.out), max_workers=int(args.workers) or None)
     print(out_path)
     return 0
 